@@ -1,240 +1,63 @@
-from flask import Flask, render_template, redirect, url_for, request, flash, send_file
+from flask import Flask, Response, render_template, redirect, url_for, request, flash, send_file
 import os
-import glob
-import pandas as pd
-import datetime
 import secrets
-from fuzzywuzzy import fuzz
-import joblib
-from data_processing import process_applications, update_model
+import threading
+from file_index import directory_index
+from instrumentation import pipeline_run, registry as metrics_registry
+from jobs import JobQueue, file_identity
+from requirements import general_requirements, job_requirements
+from settings import DEFAULT_CHUNK_SIZE, DEFAULT_OUTPUT_FORMAT, HIRING_STORE_PATH, OUTPUT_FORMATS, RESULT_EXPORT_DIR, RESULT_STORE_PATH, SCORE_MATRIX_PATH, SCORE_STORE_PATH
 
+# pandas, scipy, sklearn and fuzzywuzzy are imported inside the functions that need them, so a
+# worker starts (and serves the pages) without loading them; the first scoring request pays instead.
 
 app = Flask(__name__)
 app.secret_key = secrets.token_hex(16)  # Generate a secure secret key
 folder_path = r'C:\Users\Lenovo\OneDrive\Documents\Candidate Applications'
-
-# Define job requirements and general requirements
-job_requirements = {
-    'Software Developer / Engineer': {
-        'programming_languages': ['java', 'python', 'c', 'javascript'],
-        'other_skills': ['.NET', 'react', 'angular', 'databases', 'sql', 'nosql', 'version control systems', 'problem-solving skills', 'software development life cycle', 'communication', 'teamwork'],
-        'education': ['bachelor’s degree in computer science', 'related field'],
-        'experience': ['previous experience or internships in software development'],
-        'optional': ['portfolio', 'github repository', 'certifications like AWS, Microsoft']
-    },
-    'Data Scientist': {
-        'programming_languages': ['python', 'r'],
-        'other_skills': ['data analysis tools', 'machine learning frameworks', 'statistics', 'data preprocessing', 'data visualization', 'SQL'],
-        'education': ['bachelor’s or master’s degree in data science', 'computer science', 'statistics', 'related field'],
-        'experience': ['experience in handling large datasets'],
-        'optional': ['project experience', 'analytical skills']
-    },
-    'Project Manager': {
-        'programming_languages': [],
-        'other_skills': ['project management tools', 'risk management', 'budgeting', 'scheduling', 'communication', 'leadership', 'problem-solving', 'agile/scrum methodologies'],
-        'education': ['bachelor’s degree in business administration', 'management', 'related field'],
-        'experience': ['experience in project management'],
-        'optional': ['PMP certification', 'track record of delivering projects on time and within budget']
-    },
-    'UI/UX Designer': {
-        'programming_languages': [],
-        'other_skills': ['adobe xd', 'sketch', 'figma', 'user-centered design principles', 'wireframes', 'prototypes', 'communication'],
-        'education': ['bachelor’s degree in design', 'fine arts', 'related field'],
-        'experience': ['experience in UI/UX design'],
-        'optional': ['knowledge of HTML/CSS', 'portfolio']
-    },
-    'DevOps Engineer': {
-        'programming_languages': ['python', 'ruby', 'go', 'bash'],
-        'other_skills': ['aws', 'azure', 'google cloud', 'docker', 'kubernetes', 'ci/cd pipelines', 'terraform', 'ansible', 'prometheus', 'grafana'],
-        'education': ['bachelor’s degree in computer science', 'engineering', 'related field'],
-        'experience': ['experience in software development and system operations'],
-        'optional': ['AWS Certified DevOps Engineer', 'problem-solving skills']
-    },
-    'Marketing Specialist': {
-        'programming_languages': [],
-        'other_skills': ['google analytics', 'seo tools', 'social media platforms', 'content creation', 'communication', 'writing', 'analytical skills'],
-        'education': ['bachelor’s degree in marketing', 'communications', 'related field'],
-        'experience': ['previous experience or internships in marketing'],
-        'optional': ['portfolio of marketing campaigns', 'knowledge of marketing trends and best practices']
-    },
-    'Human Resources Manager': {
-        'programming_languages': [],
-        'other_skills': ['interpersonal skills', 'communication', 'hr software', 'workday', 'adp', 'labor laws', 'recruitment', 'onboarding', 'conflict resolution', 'organizational skills'],
-        'education': ['bachelor’s degree in human resources', 'business administration', 'related field'],
-        'experience': ['previous HR experience'],
-        'optional': ['SHRM-CP', 'PHR certifications', 'track record in managing HR functions']
-    },
-    'Financial Analyst': {
-        'programming_languages': [],
-        'other_skills': ['financial modeling', 'forecasting', 'analytical skills', 'quantitative skills', 'financial software', 'excel', 'quickbooks', 'accounting principles'],
-        'education': ['bachelor’s degree in finance', 'accounting', 'related field'],
-        'experience': ['previous experience or internships in finance'],
-        'optional': ['CFA certification', 'attention to detail']
-    },
-    'Customer Support Specialist': {
-        'programming_languages': [],
-        'other_skills': ['communication', 'interpersonal skills', 'problem-solving', 'customer support software', 'zendesk', 'salesforce', 'patience', 'empathy', 'high-stress situations'],
-        'education': ['high school diploma or equivalent; bachelor’s degree preferred'],
-        'experience': ['previous experience in customer service or support'],
-        'optional': ['multilingual abilities', 'track record of resolving customer issues']
-    },
-    'Cybersecurity Analyst': {
-        'programming_languages': [],
-        'other_skills': ['security tools', 'firewalls', 'IDS/IPS', 'network security', 'protocols', 'regulatory standards', 'GDPR', 'HIPAA', 'vulnerability assessments', 'penetration testing'],
-        'education': ['bachelor’s degree in cybersecurity', 'computer science', 'related field'],
-        'experience': ['previous experience in cybersecurity roles'],
-        'optional': ['CISSP', 'CEH certifications', 'attention to detail', 'investigative skills']
-    },
-    'Field Technician': {
-        'programming_languages': [],
-        'other_skills': ['mechanical aptitude', 'problem-solving skills', 'communication', 'teamwork'],
-        'education': ['high school diploma or equivalent', 'technical certification'],
-        'experience': ['previous experience in field work or related technical role'],
-        'optional': ['certifications in relevant field']
-    },
-    'Project Engineer': {
-        'programming_languages': [],
-        'other_skills': ['project management', 'engineering principles', 'communication', 'teamwork', 'problem-solving skills'],
-        'education': ['bachelor’s degree in engineering', 'related field'],
-        'experience': ['experience in project management or engineering projects'],
-        'optional': ['PMP certification', 'relevant engineering certifications']
-    },
-    'Senior Project Manager': {
-        'programming_languages': [],
-        'other_skills': ['advanced project management', 'leadership', 'risk management', 'budgeting', 'communication', 'teamwork'],
-        'education': ['bachelor’s degree in engineering', 'project management', 'related field'],
-        'experience': ['extensive experience in project management'],
-        'optional': ['PMP certification', 'track record of successful project delivery']
-    },
-    'Chief Operations Officer (COO)': {
-        'programming_languages': [],
-        'other_skills': ['executive leadership', 'strategic planning', 'financial acumen', 'communication', 'teamwork', 'problem-solving skills'],
-        'education': ['bachelor’s degree in business administration', 'engineering', 'related field'],
-        'experience': ['significant executive experience in operations management'],
-        'optional': ['MBA', 'track record of improving operational efficiency']
-    },
-    'Operator': {
-        'programming_languages': [],
-        'other_skills': ['mechanical aptitude', 'equipment operation', 'communication', 'teamwork'],
-        'education': ['high school diploma or equivalent'],
-        'experience': ['previous experience as an operator or in a similar role'],
-        'optional': ['certifications in equipment operation']
-    },
-    'Electrical Engineer': {
-        'programming_languages': [],
-        'other_skills': ['electrical engineering principles', 'problem-solving skills', 'communication', 'teamwork'],
-        'education': ['bachelor’s degree in electrical engineering', 'related field'],
-        'experience': ['experience in electrical engineering'],
-        'optional': ['PE license', 'relevant certifications']
-    },
-    'Mechanical Engineer': {
-        'programming_languages': [],
-        'other_skills': ['mechanical engineering principles', 'problem-solving skills', 'communication', 'teamwork'],
-        'education': ['bachelor’s degree in mechanical engineering', 'related field'],
-        'experience': ['experience in mechanical engineering'],
-        'optional': ['PE license', 'relevant certifications']
-    },
-    'Drilling Supervisor': {
-        'programming_languages': [],
-        'other_skills': ['drilling operations', 'leadership', 'problem-solving skills', 'communication', 'teamwork'],
-        'education': ['bachelor’s degree in engineering', 'related field'],
-        'experience': ['experience in drilling operations'],
-        'optional': ['relevant certifications', 'track record of successful drilling projects']
-    },
-    'Senior Electrical Engineer': {
-        'programming_languages': [],
-        'other_skills': ['advanced electrical engineering principles', 'leadership', 'problem-solving skills', 'communication', 'teamwork'],
-        'education': ['bachelor’s degree in electrical engineering', 'related field'],
-        'experience': ['extensive experience in electrical engineering'],
-        'optional': ['PE license', 'relevant certifications']
-    },
-    'Chief Executive Officer (CEO)': {
-        'programming_languages': [],
-        'other_skills': ['executive leadership', 'strategic planning', 'financial acumen', 'communication', 'teamwork', 'problem-solving skills'],
-        'education': ['bachelor’s degree in business administration', 'engineering', 'related field'],
-        'experience': ['significant executive experience in operations management'],
-        'optional': ['MBA', 'track record of successful company leadership']
-    },
-    'Site Assistant': {
-        'programming_languages': [],
-        'other_skills': ['site management', 'communication', 'teamwork', 'problem-solving skills'],
-        'education': ['high school diploma or equivalent'],
-        'experience': ['previous experience in site management or related field'],
-        'optional': ['certifications in site management']
-    },
-    'Site Engineer': {
-        'programming_languages': [],
-        'other_skills': ['site management', 'engineering principles', 'communication', 'teamwork', 'problem-solving skills'],
-        'education': ['bachelor’s degree in engineering', 'related field'],
-        'experience': ['experience in site engineering'],
-        'optional': ['PE license', 'relevant certifications']
-    },
-    'Senior Site Engineer': {
-        'programming_languages': [],
-        'other_skills': ['advanced site management', 'engineering principles', 'leadership', 'communication', 'teamwork', 'problem-solving skills'],
-        'education': ['bachelor’s degree in engineering', 'related field'],
-        'experience': ['extensive experience in site engineering'],
-        'optional': ['PE license', 'relevant certifications']
-    },
-    'Chief Engineering Officer': {
-        'programming_languages': [],
-        'other_skills': ['executive leadership', 'strategic planning', 'financial acumen', 'communication', 'teamwork', 'problem-solving skills'],
-        'education': ['bachelor’s degree in engineering', 'related field'],
-        'experience': ['significant executive experience in engineering management'],
-        'optional': ['MBA', 'track record of successful engineering projects']
-    },
-    'Sales Associate': {
-        'programming_languages': [],
-        'other_skills': ['customer service', 'sales techniques', 'communication', 'interpersonal skills', 'product knowledge'],
-        'education': ['high school diploma or equivalent'],
-        'experience': ['previous retail or sales experience'],
-        'optional': ['multilingual abilities', 'track record of achieving sales targets']
-    },
-    'Store Manager': {
-        'programming_languages': [],
-        'other_skills': ['retail management', 'leadership', 'inventory management', 'budgeting', 'customer service', 'communication'],
-        'education': ['bachelor’s degree in business administration', 'related field'],
-        'experience': ['experience in retail management'],
-        'optional': ['track record of improving store performance']
-    },
-    'Regional Manager': {
-        'programming_languages': [],
-        'other_skills': ['multi-store management', 'leadership', 'strategic planning', 'budgeting', 'communication', 'teamwork'],
-        'education': ['bachelor’s degree in business administration', 'related field'],
-        'experience': ['significant experience in retail management'],
-        'optional': ['track record of managing multiple locations']
-    },
-    'Director of Retail Operations': {
-        'programming_languages': [],
-        'other_skills': ['executive leadership', 'strategic planning', 'financial acumen', 'communication', 'teamwork', 'problem-solving skills'],
-        'education': ['bachelor’s degree in business administration', 'related field'],
-        'experience': ['extensive experience in retail management'],
-        'optional': ['MBA', 'track record of successful retail operations management']
-    }
-
-    # (Your job requirements dictionary here)
-}
-
-general_requirements = {
-    'programming_languages': [],
-    'other_skills': ['communication', 'problem-solving', 'teamwork', 'adaptability', 'time management'],
-    'education': ['bachelor’s degree in any field'],
-    'experience': ['previous relevant experience'],
-    'optional': []
-}
+# Set SCORING_WORKERS above 1 to score large batches on several cores
+scoring_workers = int(os.environ.get('SCORING_WORKERS', 1))
+scoring_chunk_size = int(os.environ.get('SCORING_CHUNK_SIZE', DEFAULT_CHUNK_SIZE))
+# Scores are reused across runs until job_requirements changes
+score_store_path = os.environ.get('SCORE_STORE_PATH', SCORE_STORE_PATH)
+# Default format for sorted candidates; a request can override it with ?format=csv|parquet|feather|xlsx
+output_format = os.environ.get('OUTPUT_FORMAT', DEFAULT_OUTPUT_FORMAT)
+# Set SKILL_INDEX_PATH (e.g. skill_index.npz) to add every processed application file to the skill index
+# behind /api/skill_search. Off by default: each run loads, extends and rewrites the whole index.
+skill_index_path = os.environ.get('SKILL_INDEX_PATH', '')
+# ?alternatives=1 adds a 'Best Alternative Role' column; the full candidates x titles matrix is saved here
+score_matrix_path = os.environ.get('SCORE_MATRIX_PATH', SCORE_MATRIX_PATH)
+# Scored candidates are stored here and queried through /api/results; the sorted file is only written
+# when it is downloaded. Empty writes the file at the end of every run instead.
+result_store_path = os.environ.get('RESULT_STORE_PATH', RESULT_STORE_PATH)
+# New hires are appended here; model.xlsx is only read once to import the older history
+hiring_store_path = os.environ.get('HIRING_STORE_PATH', HIRING_STORE_PATH)
+model_file_path = r"C:\Users\Lenovo\OneDrive\Documents\Model\model.xlsx"
+_model_server = None
+_model_server_lock = threading.Lock()
+scoring_jobs = JobQueue(max_workers=int(os.environ.get('SCORING_JOB_WORKERS', 1)))
+
+
+def get_model_server():
+    global _model_server
+    with _model_server_lock:
+        if _model_server is None:
+            from model_server import ModelServer
+
+            _model_server = ModelServer()
+    return _model_server
 
 def get_latest_file_with_keyword(folder_path, keyword):
-    files = glob.glob(os.path.join(folder_path, f"*{keyword}*.xlsx"))
-    if not files:
+    latest_file = directory_index.latest(folder_path, keyword)
+    if latest_file is None:
         raise FileNotFoundError(f"No files found with keyword '{keyword}' in folder '{folder_path}'")
-    latest_file = max(files, key=os.path.getctime)
     return latest_file
 
 def calculate_match_percentage(candidate_skills, required_skills, general_skills, years_of_experience):
-    candidate_skills_set = set(skill.strip().lower() for skill in candidate_skills.split(','))
-    required_skills_set = set(skill.strip().lower() for skill in required_skills)
-    match_count = len(candidate_skills_set.intersection(required_skills_set))
-    skill_match_percentage = (match_count / len(required_skills_set)) * 100 if required_skills_set else 0
+    # candidate_skills are canonical skills from SkillTokenizer.tokenize; required_skills/general_skills
+    # are the normalized frozensets from CompiledRequirements
+    candidate_skills_set = set(candidate_skills)
+    match_count = len(candidate_skills_set.intersection(required_skills))
+    skill_match_percentage = (match_count / len(required_skills)) * 100 if required_skills else 0
     experience_match_percentage = min(years_of_experience / 10, 100)
     return (skill_match_percentage + experience_match_percentage) / 2
 
@@ -245,52 +68,53 @@ def evaluate_other_skills(candidate_skills, required_skills, general_skills):
     return calculate_match_percentage(candidate_skills, required_skills, general_skills, 0)
 
 def evaluate_education(candidate_education, required_education):
-    return 100 if any(fuzz.partial_ratio(candidate_education.lower(), edu.lower()) > 80 for edu in required_education) else 0
+    from fuzzy_matching import matches_any
+
+    return 100 if matches_any(candidate_education.lower(), required_education) else 0
 
 def evaluate_experience(candidate_experience, required_experience):
-    return 100 if any(fuzz.partial_ratio(str(candidate_experience).lower(), exp.lower()) > 80 for exp in required_experience) else 0
+    from fuzzy_matching import matches_any
+
+    return 100 if matches_any(str(candidate_experience).lower(), required_experience) else 0
 
 def calculate_overall_match(candidate_row, job_requirements, general_requirements):
-    job_title = candidate_row['Job Title You Are Applying For \'If Not Write in Other\'']
-    job_specific_requirements = job_requirements.get(job_title, general_requirements)
-    programming_languages_match = evaluate_programming_languages(candidate_row['Skillset'], job_specific_requirements['programming_languages'], general_requirements['programming_languages'])
-    other_skills_match = evaluate_other_skills(candidate_row['Skillset'], job_specific_requirements['other_skills'], general_requirements['other_skills'])
-    education_match = evaluate_education(candidate_row['Education'], job_specific_requirements['education'])
-    experience_match = evaluate_experience(candidate_row['Years of Experience'], job_specific_requirements['experience'])
+    from compiled_requirements import compile_row_requirements
+    from settings import JOB_TITLE_COLUMN
+
+    requirements = compile_row_requirements(job_requirements, general_requirements)
+    job_specific_requirements = requirements.profile(candidate_row[JOB_TITLE_COLUMN])
+    # Tokenized once for both skill evaluations
+    candidate_skills = requirements.tokenizer.tokenize(candidate_row['Skillset'])
+    programming_languages_match = evaluate_programming_languages(candidate_skills, job_specific_requirements.programming_languages, requirements.general.programming_languages)
+    other_skills_match = evaluate_other_skills(candidate_skills, job_specific_requirements.other_skills, requirements.general.other_skills)
+    education_match = evaluate_education(candidate_row['Education'], job_specific_requirements.education)
+    experience_match = evaluate_experience(candidate_row['Years of Experience'], job_specific_requirements.experience)
     overall_match = (programming_languages_match + other_skills_match + education_match + experience_match) / 4
     return overall_match
 
-def process_applications(folder_path, job_requirements, general_requirements):
-    latest_application_file = get_latest_file_with_keyword(folder_path, "Application")
-    df = pd.read_excel(latest_application_file)
-
-    df['Match Percentage'] = df.apply(lambda row: calculate_overall_match(row, job_requirements, general_requirements), axis=1)
-    df['Age'] = datetime.datetime.now().year - pd.to_datetime(df['Birth Date']).dt.year
-
-    clusters = df.groupby('Job Title You Are Applying For \'If Not Write in Other\'')
-
-    output_file_path = 'sorted_candidates.xlsx'
-
-    with pd.ExcelWriter(output_file_path) as writer:
-        for job_title, group in clusters:
-            sorted_group = group.sort_values(by='Match Percentage', ascending=False)
-            safe_sheet_name = job_title.replace('/', '_').replace('\\', '_').replace(':', '_').replace('*', '_').replace('?', '_').replace('[', '_').replace(']', '_')
-            sorted_group = sorted_group.drop(columns=['Birth Date'])
-            sorted_group.to_excel(writer, sheet_name=safe_sheet_name, index=False)
+def process_applications(folder_path, job_requirements, general_requirements, **options):
+    # pipeline.process_applications, without falling back to general_requirements for unknown job titles
+    from pipeline import process_applications as run_pipeline
 
-    print(f"Sorted candidates file created and saved as '{output_file_path}'.")
-
-    return output_file_path
+    return run_pipeline(folder_path, job_requirements, general_requirements, general_fallback=False, **options)
 
 def update_model(new_hires_folder_path):
-    try:
-        new_hires_file = get_latest_file_with_keyword(new_hires_folder_path, "new hires")
-        new_hires_df = pd.read_excel(new_hires_file)
-        model_file_path = r"C:\Users\Lenovo\OneDrive\Documents\Model\model.xlsx"
-        model_df = pd.read_excel(model_file_path)
+    from hiring_store import HiringStore
 
-        combined_df = pd.concat([model_df, new_hires_df], ignore_index=True)
-        combined_df.to_excel(model_file_path, index=False)
+    try:
+        with pipeline_run('update_model') as run:
+            run.stage('discovery')
+            new_hires_file = get_latest_file_with_keyword(new_hires_folder_path, "new hires")
+            store = HiringStore(hiring_store_path)
+            try:
+                # model.xlsx holds the history from before the store existed; it is imported once
+                if os.path.exists(model_file_path):
+                    run.stage('import_history')
+                    run.rows(store.append_workbook(model_file_path))
+                run.stage('append')
+                run.rows(store.append_workbook(new_hires_file))
+            finally:
+                store.close()
     except Exception as e:
         raise e
 
@@ -306,16 +130,209 @@ def sorting():
 def training():
     return render_template('train.html')
 
+def positive_int(value):
+    value = int(value)
+    if value <= 0:
+        raise ValueError(value)
+    return value
+
+def optional_number(name, convert=float):
+    value = request.values.get(name)
+    return convert(value) if value else None
+
+def stored_run_exists(run_id):
+    from result_store import ResultStore
+
+    store = ResultStore(result_store_path)
+    try:
+        return store.run(run_id) is not None
+    finally:
+        store.close()
+
 @app.route('/process_and_redirect', methods=['POST'])
 def process_and_redirect():
     try:
-        # Process applications and get the output file path
-        output_file_path = process_applications(folder_path, job_requirements, general_requirements)
-        success_url = url_for('success', filename='sorted_candidates.xlsx')
-        return {'success_url': success_url}  # Return success URL for AJAX response
+        requested_format = request.values.get('format', output_format)
+        if requested_format not in OUTPUT_FORMATS:
+            return {'error': f"Unsupported output format '{requested_format}'"}, 400
+        try:
+            # ?top_k=50&min_score=60 writes only a shortlist per job title
+            top_k = optional_number('top_k', positive_int)
+            min_score = optional_number('min_score')
+        except ValueError:
+            return {'error': "top_k must be a positive integer and min_score a number"}, 400
+        alternative_roles = request.values.get('alternatives', os.environ.get('ALTERNATIVE_ROLES', '0')) == '1'
+        # ?batch=1 merges every Application export, optionally only those created from since to until (ISO dates)
+        batch = request.values.get('batch') == '1'
+        since = request.values.get('since') or None
+        until = request.values.get('until') or None
+        if batch:
+            from batch import find_application_files
+
+            try:
+                application_files = find_application_files(folder_path, "Application", since, until)
+            except ValueError:
+                return {'error': "since and until must be ISO dates, e.g. 2024-05-31"}, 400
+        else:
+            application_files = [get_latest_file_with_keyword(folder_path, "Application")]
+        # Scoring runs in the background; the client polls status_url until success_url appears
+        file_identities = tuple(file_identity(application_file) for application_file in application_files)
+        job_options = dict(
+            workers=scoring_workers, chunk_size=scoring_chunk_size, score_store_path=score_store_path,
+            skill_index_path=skill_index_path, alternative_roles=alternative_roles, score_matrix_path=score_matrix_path,
+            batch=batch, since=since, until=until)
+        if result_store_path:
+            # One stored run serves every format/top_k/min_score: those only go into the export URL,
+            # and a finished job is reused for as long as its run has not been pruned from the store
+            job_id = scoring_jobs.submit(
+                (file_identities, batch, alternative_roles), process_applications, folder_path, job_requirements, general_requirements,
+                reuse_finished=lambda job: stored_run_exists(job['result']), result_store_path=result_store_path, **job_options)
+            export_options = {'format': requested_format, 'top_k': top_k, 'min_score': min_score}
+            status_url = url_for('job_status', job_id=job_id, **{name: value for name, value in export_options.items() if value is not None})
+        else:
+            job_id = scoring_jobs.submit(
+                (file_identities, batch, requested_format, top_k, min_score, alternative_roles), process_applications, folder_path, job_requirements, general_requirements,
+                output_format=requested_format, top_n=top_k, min_score=min_score, **job_options)
+            status_url = url_for('job_status', job_id=job_id)
+        return {'job_id': job_id, 'status_url': status_url}, 202
     except FileNotFoundError as e:
         return {'error': f"Error processing applications: {str(e)}"}, 500
 
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    job = scoring_jobs.status(job_id)
+    if job is None:
+        return {'error': f"Unknown job: {job_id}"}, 404
+    response = {key: job[key] for key in ('job_id', 'status', 'stage', 'rows_scored', 'rows_total', 'eta_seconds', 'error')}
+    if job['status'] == 'finished':
+        if isinstance(job['result'], int):
+            # A stored run: the export options the job was submitted with come back on the status URL
+            export_options = {name: request.args[name] for name in ('format', 'top_k', 'min_score') if request.args.get(name)}
+            response['results_url'] = url_for('query_results', run_id=job['result'])
+            response['success_url'] = url_for('export_results', run_id=job['result'], **export_options)
+        else:
+            response['success_url'] = url_for('success', filename=os.path.basename(job['result']))
+    return response
+
+@app.route('/api/predict', methods=['POST'])
+def predict():
+    payload = request.get_json(silent=True) or {}
+    candidates = payload.get('candidates')
+    if not isinstance(candidates, list) or not candidates or not all(isinstance(candidate, dict) for candidate in candidates):
+        return {'error': "Expected a JSON body like {'candidates': [{'Skillset': ..., 'Age': ...}]}"}, 400
+    try:
+        model_server = get_model_server()
+        predictions = model_server.predict(candidates)
+    except FileNotFoundError as e:
+        return {'error': f"Model is not available: {str(e)}"}, 503
+    except TimeoutError:
+        return {'error': "The model server did not answer in time"}, 503
+    except (KeyError, ValueError, TypeError) as e:
+        return {'error': f"Invalid candidates: {str(e)}"}, 400
+    return {'predictions': predictions, 'model_version': model_server.version}
+
+@app.route('/api/skill_search')
+def skill_search():
+    # ?skills=python,sql&match=all|any (any ranks by overlap), or ?job_title=... to rank against that title's requirements
+    import pandas as pd
+    from compiled_requirements import compile_requirements
+    from skill_index import load_skill_index
+
+    if not skill_index_path:
+        return {'error': "The skill index is disabled"}, 503
+    # Skills are searched under the canonical names scoring credits them with
+    index = load_skill_index(skill_index_path, compile_requirements(job_requirements, general_requirements).tokenizer)
+    try:
+        limit = positive_int(request.args.get('limit', 100))
+        min_matches = positive_int(request.args.get('min_matches', 1))
+    except ValueError:
+        return {'error': "limit and min_matches must be positive integers"}, 400
+    job_title = request.args.get('job_title')
+    skills = [skill for skill in request.args.get('skills', '').split(',') if skill.strip()]
+    match = request.args.get('match', 'all')
+    if job_title:
+        ranked = index.match_job(job_title, job_requirements, general_requirements, min_matches)
+    elif not skills:
+        return {'error': "Expected ?skills=python,sql or ?job_title=..."}, 400
+    elif match == 'all':
+        ranked = pd.DataFrame({'candidate_id': index.match_all(skills), 'matches': len(index.canonical_skills(skills))})
+    elif match == 'any':
+        ranked = index.rank(skills, min_matches)
+    else:
+        return {'error': "match must be 'all' or 'any'"}, 400
+    top = ranked.head(limit)
+    candidates = index.describe(top['candidate_id']).assign(candidate_id=top['candidate_id'].to_numpy(), matches=top['matches'].to_numpy())
+    return {'total': len(ranked), 'candidates': [
+        {'candidate_id': int(candidate_id), 'source': source, 'row': int(row), 'matches': int(matches)}
+        for source, row, candidate_id, matches in candidates.itertuples(index=False, name=None)
+    ]}
+
+@app.route('/api/results')
+def query_results():
+    # ?title=Data Scientist&min_score=60&max_age=40&sort=match_percentage|age|job_title&order=asc|desc&limit=50;
+    # pass next_cursor back as ?cursor= for the following page. Without order, scores and ages sort
+    # highest first and job_title in the order of the sorted workbook.
+    from result_store import ResultStore
+
+    if not result_store_path:
+        return {'error': "The result store is disabled"}, 503
+    try:
+        run_id = optional_number('run_id', int)
+        filters = {name: optional_number(name) for name in ('min_score', 'max_score', 'min_age', 'max_age')}
+        limit = optional_number('limit', positive_int) or 50
+    except ValueError:
+        return {'error': "run_id and limit must be positive integers, min/max_score and min/max_age numbers"}, 400
+    order = request.values.get('order')
+    if order not in (None, 'asc', 'desc'):
+        return {'error': "order must be asc or desc"}, 400
+    store = ResultStore(result_store_path)
+    try:
+        run_id = store.latest_run() if run_id is None else run_id
+        candidates, next_cursor = store.query(
+            run_id, titles=request.values.getlist('title'), sort=request.values.get('sort', 'match_percentage'),
+            descending=None if order is None else order == 'desc', limit=limit, cursor=request.values.get('cursor') or None, **filters)
+    except KeyError:
+        return {'error': f"Unknown run: {run_id}"}, 404
+    except ValueError as e:
+        return {'error': str(e)}, 400
+    finally:
+        store.close()
+    return {'run_id': run_id, 'candidates': candidates, 'next_cursor': next_cursor}
+
+@app.route('/api/results/<int:run_id>/export')
+def export_results(run_id):
+    # The sorted file of a stored run, written on the first request for each format/top_k/min_score
+    from output_writers import output_path_for
+    from result_store import ResultStore, export_base_name, export_results as export_run
+
+    if not result_store_path:
+        return {'error': "The result store is disabled"}, 503
+    requested_format = request.values.get('format', output_format)
+    if requested_format not in OUTPUT_FORMATS:
+        return {'error': f"Unsupported output format '{requested_format}'"}, 400
+    try:
+        top_k = optional_number('top_k', positive_int)
+        min_score = optional_number('min_score')
+    except ValueError:
+        return {'error': "top_k must be a positive integer and min_score a number"}, 400
+    store = ResultStore(result_store_path)
+    try:
+        stored_run = store.run(run_id)
+    finally:
+        store.close()
+    if stored_run is None:
+        return {'error': f"Unknown run: {run_id}"}, 404
+    base_name = export_base_name(run_id, stored_run['created_at'], top_k, min_score)
+    export_path = os.path.abspath(os.path.join(RESULT_EXPORT_DIR, output_path_for(requested_format, base_name)))
+    if not os.path.exists(export_path):
+        os.makedirs(RESULT_EXPORT_DIR, exist_ok=True)
+        export_run(run_id, export_path, requested_format, top_n=top_k, min_score=min_score, path=result_store_path)
+    return send_file(export_path, as_attachment=True, download_name=output_path_for(requested_format))
+
+@app.route('/metrics')
+def metrics():
+    return Response(metrics_registry.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/success/<filename>')
 def success(filename):
     return render_template('success.html', filename=filename)
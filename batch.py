@@ -0,0 +1,131 @@
+import datetime
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from dates import BirthDateParser, birth_date_ages
+from file_index import directory_index
+from parse_cache import read_excel_cached
+from scoring import SCORING_COLUMNS
+
+# Batch mode scores every application export in a folder together, one per job board per day.
+# Merged rows keep the name of the workbook they came from in SOURCE_COLUMN.
+SOURCE_COLUMN = 'Source File'
+INGEST_REPORT_COLUMNS = ['file', 'modified', 'rows', 'duplicates', 'candidates', 'seconds', 'error']
+INGEST_REPORT_NAME = 'ingest_report.csv'
+# What makes two rows the same candidate; board-specific metadata columns are left out
+IDENTITY_COLUMNS = SCORING_COLUMNS + ['Name', 'Birth Date']
+
+
+def timestamp_bound(value, end_of_day=False):
+    # None, a POSIX timestamp, a date/datetime or an ISO string; a bare date used as an
+    # end bound covers that whole day
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    date_only = isinstance(value, str) and len(value.strip()) == 10
+    if isinstance(value, str):
+        value = datetime.datetime.fromisoformat(value.strip())
+    elif not isinstance(value, datetime.datetime):
+        date_only = True
+        value = datetime.datetime.combine(value, datetime.time())
+    if date_only and end_of_day:
+        value += datetime.timedelta(days=1)
+    return value.timestamp()
+
+def find_application_files(folder_path, keyword='Application', since=None, until=None):
+    # Every matching workbook, newest first, optionally only those created between since and until
+    application_files = directory_index.files(folder_path, keyword, timestamp_bound(since), timestamp_bound(until, end_of_day=True))
+    if not application_files:
+        raise FileNotFoundError(f"No files found with keyword '{keyword}' in folder '{folder_path}'")
+    return application_files
+
+def _read_file(path):
+    start = time.perf_counter()
+    df = read_excel_cached(path)
+    return df, time.perf_counter() - start
+
+def read_application_files(application_files, workers=1):
+    # Parses the workbooks in parallel processes (openpyxl holds the GIL, so threads would not overlap).
+    # Returns [(path, df)] for the files that parsed and one report entry per file;
+    # a file that cannot be read is reported and left out instead of failing the batch.
+    results = {}
+    if workers > 1 and len(application_files) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(application_files))) as executor:
+            futures = {path: executor.submit(_read_file, path) for path in application_files}
+            for path, future in futures.items():
+                try:
+                    results[path] = future.result()
+                except Exception as e:
+                    results[path] = e
+    else:
+        for path in application_files:
+            try:
+                results[path] = _read_file(path)
+            except Exception as e:
+                results[path] = e
+    frames = []
+    report = []
+    for path in application_files:
+        entry = {'file': path, 'modified': datetime.datetime.fromtimestamp(os.path.getmtime(path)).isoformat(timespec='seconds')}
+        if isinstance(results[path], Exception):
+            entry['error'] = f"{type(results[path]).__name__}: {results[path]}"
+            print(f"Skipped '{path}': {entry['error']}")
+        else:
+            df, seconds = results[path]
+            entry.update(rows=len(df), seconds=round(seconds, 3))
+            frames.append((path, df))
+        report.append(entry)
+    return frames, report
+
+def identity_columns(frames):
+    # The identity columns every file has, so a board that omits Name still matches on the rest;
+    # without any of them, the columns all files share
+    shared = [column for column in frames[0][1].columns if all(column in df.columns for _, df in frames[1:])]
+    return [column for column in IDENTITY_COLUMNS if column in shared] or sorted(shared, key=str)
+
+def _row_hashes(df, columns):
+    # Values compared as text, in the same column order for every file
+    return pd.util.hash_pandas_object(df[columns].astype(str), index=False).to_numpy().view(np.int64)
+
+def merge_applications(frames, report):
+    # Concatenates the files newest first. A candidate already seen in a newer file (same identity
+    # columns, whatever other columns the boards add) is dropped, so a candidate exported by several
+    # job boards is scored and listed once; repeats within one file are kept as before.
+    seen = set()
+    merged = []
+    entries = {entry['file']: entry for entry in report}
+    columns = identity_columns(frames) if frames else []
+    for path, df in frames:
+        row_hashes = _row_hashes(df, columns)
+        duplicate = np.fromiter((row_hash in seen for row_hash in row_hashes.tolist()), dtype=bool, count=len(df))
+        seen.update(row_hashes.tolist())
+        entries[path].update(duplicates=int(duplicate.sum()), candidates=int((~duplicate).sum()))
+        merged.append(df[~duplicate].assign(**{SOURCE_COLUMN: os.path.basename(path)}))
+    if not merged:
+        raise ValueError("None of the application files could be read")
+    df = pd.concat(merged, ignore_index=True)
+    df[SOURCE_COLUMN] = df[SOURCE_COLUMN].astype('category')
+    return df
+
+def birth_date_ages_per_source(df):
+    # One parser per export, since each job board formats birth dates its own way
+    ages = pd.Series(pd.NA, index=df.index, dtype='Int16')
+    for _, rows in df.groupby(SOURCE_COLUMN, sort=False, observed=True):
+        ages[rows.index] = birth_date_ages(rows['Birth Date'], BirthDateParser()).to_numpy()
+    return ages
+
+def write_ingest_report(report, output_file_path):
+    # Written next to the merged output as ingest_report.csv
+    report_path = os.path.join(os.path.dirname(output_file_path), INGEST_REPORT_NAME)
+    report_frame = pd.DataFrame(report, columns=INGEST_REPORT_COLUMNS)
+    # Integer counts, left empty for files that could not be read
+    report_frame = report_frame.astype({'rows': 'Int64', 'duplicates': 'Int64', 'candidates': 'Int64'})
+    report_frame.to_csv(report_path, index=False)
+    total = sum(entry.get('candidates', 0) for entry in report)
+    print(f"Merged {total} candidates from {len(report)} files; ingest report saved as '{report_path}'.")
+    return report_path
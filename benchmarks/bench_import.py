@@ -0,0 +1,52 @@
+# Times a cold `import app` (what each web worker pays before it can serve a request) in fresh interpreters.
+# Run from the repository root: python -m benchmarks.bench_import --runs 5
+# and compare with the modules a scoring request loads later: python -m benchmarks.bench_import --modules app data_processing
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+HEAVY_MODULES = ['pandas', 'numpy', 'scipy', 'sklearn', 'fuzzywuzzy', 'joblib', 'data_processing']
+
+
+def import_seconds(module):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', f'import {module}'], check=True, capture_output=True)
+    return time.perf_counter() - start
+
+def import_profile(module):
+    # -X importtime writes 'import time: self [us] | cumulative | imported package' lines to stderr
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], check=True, capture_output=True, text=True)
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        profile[name.strip()] = int(cumulative) / 1e6
+    return profile
+
+def benchmark(module, runs=5, top=10):
+    baseline = statistics.median(import_seconds('sys') for _ in range(runs))
+    seconds = statistics.median(import_seconds(module) for _ in range(runs))
+    profile = import_profile(module)
+    loaded = [name for name in HEAVY_MODULES if name in profile]
+    print(f"import {module}: {seconds:.3f}s median of {runs} ({seconds - baseline:.3f}s over a bare interpreter)")
+    print(f"  heavy modules loaded: {', '.join(loaded) if loaded else 'none'}")
+    for name, cumulative in sorted(profile.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {cumulative:8.3f}s  {name}")
+    return seconds
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the cold import time of the web app')
+    parser.add_argument('--modules', nargs='+', default=['app', 'data_processing'])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    for module in args.modules:
+        benchmark(module, args.runs, args.top)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+# Compares the per-group pd.ExcelWriter loop with the output_writers formats.
+# Run from the repository root: python -m benchmarks.bench_output --rows 200000
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import synthetic_applications
+from output_writers import OUTPUT_FORMATS, sorted_groups, write_groups
+from scoring import JOB_TITLE_COLUMN
+
+
+def scored_applications(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    df = synthetic_applications(rows, seed)
+    df = df.drop(columns=['Birth Date'])
+    df['Match Percentage'] = rng.integers(0, 400, size=rows) / 4
+    df['Age'] = rng.integers(18, 65, size=rows)
+    return df
+
+def excel_writer_loop(df, output_file_path):
+    # The loop process_applications used before output_writers
+    with pd.ExcelWriter(output_file_path) as writer:
+        for job_title, group in df.groupby(JOB_TITLE_COLUMN):
+            sorted_group = group.sort_values(by='Match Percentage', ascending=False)
+            safe_sheet_name = job_title.replace('/', '_').replace('\\', '_').replace(':', '_').replace('*', '_').replace('?', '_').replace('[', '_').replace(']', '_')
+            sorted_group.to_excel(writer, sheet_name=safe_sheet_name, index=False)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark sorted candidate output formats')
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    df = scored_applications(args.rows, args.seed)
+    with tempfile.TemporaryDirectory() as output_dir:
+        output_file_path = os.path.join(output_dir, 'baseline.xlsx')
+        start = time.perf_counter()
+        excel_writer_loop(df, output_file_path)
+        baseline_seconds = time.perf_counter() - start
+        print(f"pd.ExcelWriter loop: {baseline_seconds:.3f}s, {os.path.getsize(output_file_path) / 1e6:.1f} MB")
+
+        for output_format in OUTPUT_FORMATS:
+            output_file_path = os.path.join(output_dir, f'sorted_candidates.{output_format}')
+            start = time.perf_counter()
+            write_groups(sorted_groups(df), output_file_path, output_format)
+            seconds = time.perf_counter() - start
+            print(f"{output_format}: {seconds:.3f}s ({baseline_seconds / seconds:.1f}x), "
+                  f"{os.path.getsize(output_file_path) / 1e6:.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+# Times each stage of the data_processing pipeline on synthetic workbooks and saves the results as JSON.
+# Run from the repository root: python -m benchmarks.bench_pipeline --rows 1000 10000 100000 --output bench.json
+# and compare two runs with: python -m benchmarks.bench_pipeline --compare before.json after.json
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+
+import pandas as pd
+
+import data_processing
+from benchmarks.synthetic import write_application_workbook
+from compact import compact_applications
+from compiled_requirements import compile_requirements
+from dates import birth_date_ages
+from features import hashed_features, make_hashed_pipeline
+from file_index import DirectoryIndex
+from output_writers import DEFAULT_OUTPUT_FORMAT, OUTPUT_FORMATS, output_path_for, sorted_groups, write_groups
+from parse_cache import read_excel_cached
+from scoring import score_applications_parallel
+
+STAGES = ['discovery', 'parse', 'compact', 'score', 'age', 'groupby_sort', 'write', 'train']
+
+
+def current_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_pipeline(folder_path, workers=1, output_format=DEFAULT_OUTPUT_FORMAT):
+    # Same steps as pipeline.process_applications, each timed on its own
+    timings = {}
+
+    def timed(stage, function):
+        start = time.perf_counter()
+        result = function()
+        timings[stage] = time.perf_counter() - start
+        return result
+
+    # A fresh index, so discovery is timed cold rather than from the module-level cache
+    application_file = timed('discovery', lambda: DirectoryIndex().latest(folder_path, 'Application'))
+    df = timed('parse', lambda: read_excel_cached(application_file, cache_dir=''))
+    df = timed('compact', lambda: compact_applications(df))
+    requirements = compile_requirements(data_processing.job_requirements, data_processing.general_requirements)
+    df['Match Percentage'] = timed('score', lambda: score_applications_parallel(df, requirements, workers=workers))
+    df['Age'] = timed('age', lambda: birth_date_ages(df['Birth Date']))
+    df = df.drop(columns=['Birth Date'])
+    groups = timed('groupby_sort', lambda: list(sorted_groups(df)))
+    output_file_path = os.path.join(folder_path, output_path_for(output_format))
+    timed('write', lambda: write_groups(groups, output_file_path, output_format))
+    timed('train', lambda: make_hashed_pipeline().fit(hashed_features(df), df['Match Percentage']))
+    return timings
+
+def benchmark(row_counts, seed=0, workers=1, output_format=DEFAULT_OUTPUT_FORMAT):
+    results = []
+    for rows in row_counts:
+        with tempfile.TemporaryDirectory() as folder_path:
+            start = time.perf_counter()
+            write_application_workbook(os.path.join(folder_path, 'Application_synthetic.xlsx'), rows, seed)
+            generate_seconds = time.perf_counter() - start
+            timings = run_pipeline(folder_path, workers, output_format)
+        total = sum(timings.values())
+        results.append({
+            'rows': rows,
+            'generate_seconds': generate_seconds,
+            'stages': {stage: {'seconds': seconds, 'rows_per_second': rows / seconds if seconds else None}
+                       for stage, seconds in timings.items()},
+            'total_seconds': total,
+        })
+        print(f"{rows} rows: " + ', '.join(f"{stage} {seconds:.3f}s" for stage, seconds in timings.items()) + f", total {total:.3f}s")
+    return results
+
+def compare(before_path, after_path):
+    with open(before_path, encoding='utf-8') as before_file, open(after_path, encoding='utf-8') as after_file:
+        before, after = json.load(before_file), json.load(after_file)
+    before_by_rows = {result['rows']: result for result in before['results']}
+    print(f"{before.get('commit')} -> {after.get('commit')} (speedup, >1 is faster)")
+    for result in after['results']:
+        previous = before_by_rows.get(result['rows'])
+        if previous is None:
+            continue
+        speedups = []
+        for stage in STAGES + ['total']:
+            old = previous['total_seconds'] if stage == 'total' else previous['stages'].get(stage, {}).get('seconds')
+            new = result['total_seconds'] if stage == 'total' else result['stages'].get(stage, {}).get('seconds')
+            if old and new:
+                speedups.append(f"{stage} {old / new:.2f}x")
+        print(f"{result['rows']} rows: " + ', '.join(speedups))
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the candidate processing pipeline stage by stage')
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default=DEFAULT_OUTPUT_FORMAT)
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'))
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+    report = {
+        'commit': current_commit(),
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'pandas': pd.__version__,
+        'workers': args.workers,
+        'format': args.format,
+        'seed': args.seed,
+        'results': benchmark(args.rows, args.seed, args.workers, args.format),
+    }
+    with open(args.output, 'w', encoding='utf-8') as output_file:
+        json.dump(report, output_file, indent=2)
+    print(f"Results saved to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
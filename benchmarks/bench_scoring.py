@@ -0,0 +1,40 @@
+# Compares the row-wise df.apply scorer with the batch scoring engine.
+# Run from the repository root: python -m benchmarks.bench_scoring --rows 200000
+import argparse
+import time
+
+import numpy as np
+
+import app
+import data_processing
+from benchmarks.synthetic import synthetic_applications
+from compiled_requirements import compile_requirements
+from scoring import score_applications
+
+
+def time_call(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark row-wise vs batch candidate scoring')
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    df = synthetic_applications(args.rows, args.seed)
+    for label, module, general_fallback in (('app', app, False), ('data_processing', data_processing, True)):
+        requirements = compile_requirements(module.job_requirements, module.general_requirements)
+        row_wise, row_wise_seconds = time_call(lambda: df.apply(
+            lambda row: module.calculate_overall_match(row, requirements, None), axis=1))
+        batch, batch_seconds = time_call(lambda: score_applications(
+            df, requirements, general_fallback=general_fallback))
+        if not np.array_equal(row_wise.to_numpy(), batch.to_numpy()):
+            raise AssertionError(f"{label}: batch scores differ from calculate_overall_match")
+        print(f"{label}: {args.rows} rows, df.apply {row_wise_seconds:.3f}s, batch {batch_seconds:.3f}s "
+              f"({row_wise_seconds / batch_seconds:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+# Measures Skillset tokenization: throughput with a cold and a warm memo, against a plain
+# split(',') + strip().lower(), and the memory the memo holds.
+# Run from the repository root: python -m benchmarks.bench_tokenizer --rows 100000 --noise 0.3
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+import requirements
+from benchmarks.synthetic import synthetic_applications
+from compiled_requirements import compile_requirements
+from skill_normalization import SkillTokenizer
+
+# Spellings the alias table, version rule and multi-word trie resolve
+NOISY_SKILLS = [
+    'Python3', 'py', 'JS', 'golang', 'K8s', 'java 8', 'ReactJS', 'GCP', 'agile',
+    'git and version control systems', 'experience with Google Cloud Platform', 'strong problem solving',
+]
+
+
+def skillsets(rows, seed=0, noise=0.0):
+    values = synthetic_applications(rows, seed)['Skillset']
+    rng = np.random.default_rng(seed)
+    noisy = rng.random(rows) < noise
+    values[noisy] = values[noisy] + ', ' + rng.choice(NOISY_SKILLS, size=int(noisy.sum()))
+    return values.tolist()
+
+def split_lower(skillset):
+    return tuple(dict.fromkeys(skill.strip().lower() for skill in str(skillset).split(',')))
+
+def time_pass(function, values):
+    start = time.perf_counter()
+    for value in values:
+        function(value)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the memoized skill tokenizer')
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--noise', type=float, default=0.3, help='share of skillsets given an aliased or free-text skill')
+    args = parser.parse_args()
+
+    values = skillsets(args.rows, args.seed, args.noise)
+    vocabulary = compile_requirements(requirements.job_requirements, requirements.general_requirements).vocabulary
+    distinct = len(set(values))
+
+    baseline = time_pass(split_lower, values)
+    tokenizer = SkillTokenizer(vocabulary)
+    cold = time_pass(tokenizer.tokenize, values)
+    warm = time_pass(tokenizer.tokenize, values)
+    # Memory is measured on a separate pass, since tracing slows the timed ones down
+    tracemalloc.start()
+    traced_tokenizer = SkillTokenizer(vocabulary)
+    time_pass(traced_tokenizer.tokenize, values)
+    memo_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print(f"{args.rows} skillsets ({distinct} distinct), {args.noise:.0%} with aliased or free-text skills")
+    for label, seconds in (('split + lower', baseline), ('tokenizer, cold memo', cold), ('tokenizer, warm memo', warm)):
+        print(f"  {label:22} {seconds:.3f}s  {args.rows / seconds:,.0f} skillsets/s")
+    cache = tokenizer.cache_info()
+    print(f"  memo: {cache['skillsets']} skillsets, {cache['tokens']} skills, {memo_bytes / 2 ** 20:.1f} MiB traced")
+
+
+if __name__ == '__main__':
+    main()
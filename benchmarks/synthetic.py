@@ -0,0 +1,56 @@
+# Synthetic application data shaped like the real "Application" workbooks.
+# Write a workbook from the repository root: python -m benchmarks.synthetic --rows 100000 --output Application_synthetic.xlsx
+import argparse
+
+import numpy as np
+import pandas as pd
+
+import data_processing
+from scoring import JOB_TITLE_COLUMN
+
+EDUCATIONS = [
+    'BSc Computer Science', 'Bachelor’s degree in Engineering', 'MBA',
+    'High School Diploma', 'Master’s degree in Data Science', 'Bachelor’s degree in Marketing',
+]
+EXPERIENCE = ['0', '1', '2', '5', '10', 'previous HR experience', 'experience in retail management']
+EXTRA_SKILLS = ['excel', 'git', 'linux', 'photoshop']
+
+
+def synthetic_applications(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    titles = list(data_processing.job_requirements) + ['Other']
+    skills = sorted(set(
+        skill
+        for requirements in data_processing.job_requirements.values()
+        for skill in requirements['programming_languages'] + requirements['other_skills']
+    )) + EXTRA_SKILLS
+    skillsets = [
+        ', '.join(rng.choice(skills, size=rng.integers(1, 10), replace=False))
+        for _ in range(rows)
+    ]
+    # Birth dates between 1960 and 2005, at midnight like the dates Excel stores
+    birth_dates = pd.Timestamp('1960-01-01') + pd.to_timedelta(rng.integers(0, 45 * 365, size=rows), unit='D')
+    return pd.DataFrame({
+        JOB_TITLE_COLUMN: rng.choice(titles, size=rows),
+        'Skillset': skillsets,
+        'Education': rng.choice(EDUCATIONS, size=rows),
+        'Years of Experience': rng.choice(EXPERIENCE, size=rows),
+        'Birth Date': birth_dates,
+        'Name': [f'Candidate {number}' for number in range(rows)],
+    })
+
+def write_application_workbook(output_file_path, rows, seed=0):
+    synthetic_applications(rows, seed).to_excel(output_file_path, index=False)
+    return output_file_path
+
+def main():
+    parser = argparse.ArgumentParser(description='Write a synthetic application workbook')
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='Application_synthetic.xlsx')
+    args = parser.parse_args()
+    print(f"Wrote {args.rows} applications to {write_application_workbook(args.output, args.rows, args.seed)}")
+
+
+if __name__ == '__main__':
+    main()
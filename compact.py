@@ -0,0 +1,28 @@
+import pandas as pd
+
+from scoring import JOB_TITLE_COLUMN
+
+CATEGORICAL_COLUMNS = [JOB_TITLE_COLUMN, 'Education', 'Skillset', 'Years of Experience', 'Birth Date']
+# A column with more distinct values than this share of its rows stays as plain strings,
+# since its categories would take as much memory as the strings themselves
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+
+def compact_applications(df):
+    # Text columns with repeated values become categoricals: one int8/int16 code per row plus
+    # each distinct string once. Only all-text columns are converted, so categories stay sortable
+    # and astype(str) (used by the score store fingerprints) gives the same strings as before.
+    df = df.copy(deep=False)
+    for column in CATEGORICAL_COLUMNS:
+        if column not in df.columns or not pd.api.types.is_string_dtype(df[column].dtype):
+            continue
+        values = df[column]
+        if pd.api.types.infer_dtype(values, skipna=True) != 'string':
+            continue
+        if values.nunique(dropna=True) <= CATEGORY_MAX_UNIQUE_RATIO * len(values):
+            df[column] = values.astype('category')
+    return df
+
+def compact_ages(ages):
+    # Ages are whole years; Int16 keeps missing birth dates as <NA> at a quarter of float64's size
+    return ages.astype('Int16')
@@ -0,0 +1,136 @@
+import hashlib
+import json
+from collections import namedtuple
+
+import numpy as np
+from scipy import sparse
+
+import skill_normalization
+from skill_normalization import SkillTokenizer
+
+SKILL_ID_FIELDS = {
+    'programming_languages': 'programming_language_ids',
+    'other_skills': 'other_skill_ids',
+}
+
+JobProfile = namedtuple('JobProfile', [
+    'programming_languages', 'other_skills', 'education', 'experience',
+    'programming_language_ids', 'other_skill_ids',
+])
+
+
+def normalize_skill(skill):
+    return skill.strip().lower()
+
+def requirements_fingerprint(job_requirements, general_requirements):
+    # The alias table is part of it, since it decides which skills a candidate is credited with
+    payload = json.dumps([job_requirements, general_requirements, skill_normalization.SKILL_ALIASES], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class CompiledRequirements:
+    # Frozen, normalized view of job_requirements/general_requirements.
+    # Profiles are indexed by title position; the last position is general_requirements.
+
+    def __init__(self, job_requirements, general_requirements):
+        self.fingerprint = requirements_fingerprint(job_requirements, general_requirements)
+        self.titles = tuple(job_requirements)
+        self.title_positions = {title: position for position, title in enumerate(self.titles)}
+        self.general_position = len(self.titles)
+        self.vocabulary = {}
+        self.profiles = tuple(
+            self._compile_profile(requirements)
+            for requirements in [job_requirements[title] for title in self.titles] + [general_requirements]
+        )
+        self.general = self.profiles[self.general_position]
+        self.tokenizer = SkillTokenizer(self.vocabulary)
+        self._requirement_matrices = {}
+
+    def _intern(self, skills):
+        return frozenset(self.vocabulary.setdefault(skill, len(self.vocabulary)) for skill in skills)
+
+    def _compile_profile(self, requirements):
+        programming_languages = frozenset(normalize_skill(skill) for skill in requirements['programming_languages'])
+        other_skills = frozenset(normalize_skill(skill) for skill in requirements['other_skills'])
+        return JobProfile(
+            programming_languages=programming_languages,
+            other_skills=other_skills,
+            education=tuple(edu.lower() for edu in requirements['education']),
+            experience=tuple(exp.lower() for exp in requirements['experience']),
+            programming_language_ids=self._intern(programming_languages),
+            other_skill_ids=self._intern(other_skills),
+        )
+
+    def position(self, job_title):
+        try:
+            return self.title_positions.get(job_title, self.general_position)
+        except TypeError:
+            return self.general_position
+
+    def profile(self, job_title):
+        return self.profiles[self.position(job_title)]
+
+    def effective_skill_ids(self, key, general_fallback):
+        field = SKILL_ID_FIELDS[key]
+        general_ids = getattr(self.general, field)
+        skill_ids = []
+        for profile in self.profiles:
+            ids = getattr(profile, field)
+            skill_ids.append(general_ids if general_fallback and not ids else ids)
+        return skill_ids
+
+    def requirement_matrix(self, key, general_fallback):
+        # Sparse vocabulary x title indicator matrix plus the number of required skills per title
+        cache_key = (key, general_fallback)
+        if cache_key not in self._requirement_matrices:
+            skill_ids = self.effective_skill_ids(key, general_fallback)
+            rows = np.fromiter((skill_id for ids in skill_ids for skill_id in ids), dtype=np.int64)
+            cols = np.repeat(np.arange(len(skill_ids)), [len(ids) for ids in skill_ids])
+            matrix = sparse.csr_matrix(
+                (np.ones(len(rows), dtype=np.float64), (rows, cols)),
+                shape=(len(self.vocabulary), len(skill_ids)))
+            counts = np.array([len(ids) for ids in skill_ids], dtype=np.int64)
+            self._requirement_matrices[cache_key] = (matrix, counts)
+        return self._requirement_matrices[cache_key]
+
+
+_compiled_cache = {}
+_identity_cache = {}
+
+def _identity(job_requirements, general_requirements):
+    return (id(job_requirements), id(general_requirements), id(skill_normalization.SKILL_ALIASES))
+
+def _shape(job_requirements, general_requirements):
+    return (len(job_requirements), len(general_requirements or ()), len(skill_normalization.SKILL_ALIASES))
+
+def compile_requirements(job_requirements, general_requirements=None):
+    if isinstance(job_requirements, CompiledRequirements):
+        return job_requirements
+    # Recompiled only when the requirement contents change; fingerprinted on every call, so
+    # requirements edited in place are picked up (and invalidate the score store) on the next run
+    fingerprint = requirements_fingerprint(job_requirements, general_requirements)
+    compiled = _compiled_cache.get(fingerprint)
+    if compiled is None:
+        if len(_compiled_cache) >= 8:
+            _compiled_cache.clear()
+            _identity_cache.clear()
+        compiled = CompiledRequirements(job_requirements, general_requirements)
+        _compiled_cache[fingerprint] = compiled
+    # Refreshes what compile_row_requirements hands out for these dicts. They are kept alive with
+    # the entry, so their ids cannot be reused by other objects.
+    if len(_identity_cache) >= 64:
+        _identity_cache.clear()
+    _identity_cache[_identity(job_requirements, general_requirements)] = (
+        (job_requirements, general_requirements, skill_normalization.SKILL_ALIASES), _shape(job_requirements, general_requirements), compiled)
+    return compiled
+
+def compile_row_requirements(job_requirements, general_requirements=None):
+    # For row-wise scoring (calculate_overall_match), which passes the same dicts for every row:
+    # they are looked up by identity and only fingerprinted when new or when they gained/lost titles.
+    # A skill list edited in place is seen once a run entry point calls compile_requirements again.
+    if isinstance(job_requirements, CompiledRequirements):
+        return job_requirements
+    cached = _identity_cache.get(_identity(job_requirements, general_requirements))
+    if cached is not None and cached[1] == _shape(job_requirements, general_requirements):
+        return cached[2]
+    return compile_requirements(job_requirements, general_requirements)
@@ -0,0 +1,57 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from compiled_requirements import compile_requirements
+from fuzzy_matching import match_matrix
+from scoring import JOB_TITLE_COLUMN, encode_skillsets, skill_match_percentage, title_positions
+from settings import SCORE_MATRIX_PATH
+
+
+def score_matrix(df, job_requirements, general_requirements=None, general_fallback=True):
+    # candidates x job titles; column j is what score_applications gives a candidate applying for titles[j]
+    requirements = compile_requirements(job_requirements, general_requirements)
+    candidate_matrix = encode_skillsets(df['Skillset'], requirements)
+    programming_languages_match = skill_match_percentage(
+        candidate_matrix, *requirements.requirement_matrix('programming_languages', general_fallback))
+    other_skills_match = skill_match_percentage(
+        candidate_matrix, *requirements.requirement_matrix('other_skills', general_fallback))
+    education_match = match_matrix(df['Education'], [profile.education for profile in requirements.profiles])
+    experience_match = match_matrix(df['Years of Experience'], [profile.experience for profile in requirements.profiles])
+    overall_match = (programming_languages_match + other_skills_match + education_match + experience_match) / 4
+    # The last column is general_requirements, which is not a role anyone can be suggested for
+    return overall_match[:, :requirements.general_position], requirements.titles
+
+def best_alternative_roles(matrix, titles, job_titles, requirements):
+    # Best-scoring title other than the one applied for; ties go to the earlier title
+    if not len(titles):
+        return np.full(len(matrix), None, dtype=object), np.full(len(matrix), np.nan)
+    alternatives = matrix.copy()
+    positions = title_positions(job_titles, requirements)
+    applied = positions < len(titles)
+    alternatives[np.flatnonzero(applied), positions[applied]] = -np.inf
+    best = alternatives.argmax(axis=1)
+    return np.asarray(titles, dtype=object)[best], alternatives[np.arange(len(matrix)), best]
+
+def add_best_alternative_roles(df, job_requirements, general_requirements=None, general_fallback=True, matrix_path=None):
+    # Adds 'Best Alternative Role' and 'Best Alternative Match' and optionally saves the full matrix
+    requirements = compile_requirements(job_requirements, general_requirements)
+    matrix, titles = score_matrix(df, requirements, general_fallback=general_fallback)
+    if matrix_path:
+        save_score_matrix(matrix_path, matrix, titles)
+    roles, scores = best_alternative_roles(matrix, titles, df[JOB_TITLE_COLUMN], requirements)
+    df['Best Alternative Role'] = roles
+    df['Best Alternative Match'] = scores
+    return df
+
+def save_score_matrix(path, matrix, titles):
+    # float32 halves the file and still holds far more precision than the percentages need
+    temporary_path = f'{path}.{os.getpid()}.tmp.npz'
+    np.savez_compressed(temporary_path, scores=matrix.astype(np.float32), titles=np.array(titles, dtype=str))
+    os.replace(temporary_path, path)
+    return path
+
+def load_score_matrix(path=SCORE_MATRIX_PATH):
+    with np.load(path) as stored:
+        return pd.DataFrame(stored['scores'], columns=stored['titles'].tolist())
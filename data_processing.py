@@ -2,238 +2,40 @@
 import pandas as pd
 import numpy as np
 import joblib
-import datetime
 from sklearn.linear_model import SGDRegressor
 from sklearn.model_selection import train_test_split
 from sklearn.feature_extraction.text import CountVectorizer
-from fuzzywuzzy import fuzz
 from sklearn.impute import SimpleImputer
 from sklearn.pipeline import make_pipeline
 from sklearn.ensemble import HistGradientBoostingRegressor
 import os
-import glob
 from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
+from compiled_requirements import compile_requirements, compile_row_requirements
+from dates import birth_date_ages
+from file_index import directory_index
+from hiring_store import BATCH_COLUMN, ROW_ID_COLUMN, HiringStore
+from fuzzy_matching import matches_any
+from instrumentation import pipeline_run
+from parse_cache import content_digest
+from pipeline import process_applications as run_pipeline
+from scoring import JOB_TITLE_COLUMN, score_applications
+from features import HASHED_MODEL_PATH, build_features, hashed_features, make_hashed_pipeline, skillsets_from_features
+from requirements import general_requirements, job_requirements
+from settings import HIRING_STORE_PATH, USE_HASHED_FEATURES
+from training import TRAINING_HISTORY_DIR, TrainingHistory, incremental_fit
 
-# Requirements dictionary remains the same
-job_requirements = {
-    'Software Developer / Engineer': {
-        'programming_languages': ['java', 'python', 'c', 'javascript'],
-        'other_skills': ['.NET', 'react', 'angular', 'databases', 'sql', 'nosql', 'version control systems', 'problem-solving skills', 'software development life cycle', 'communication', 'teamwork'],
-        'education': ['bachelor’s degree in computer science', 'related field'],
-        'experience': ['previous experience or internships in software development'],
-        'optional': ['portfolio', 'github repository', 'certifications like AWS, Microsoft']
-    },
-    'Data Scientist': {
-        'programming_languages': ['python', 'r'],
-        'other_skills': ['data analysis tools', 'machine learning frameworks', 'statistics', 'data preprocessing', 'data visualization', 'SQL'],
-        'education': ['bachelor’s or master’s degree in data science', 'computer science', 'statistics', 'related field'],
-        'experience': ['experience in handling large datasets'],
-        'optional': ['project experience', 'analytical skills']
-    },
-    'Project Manager': {
-        'programming_languages': [],
-        'other_skills': ['project management tools', 'risk management', 'budgeting', 'scheduling', 'communication', 'leadership', 'problem-solving', 'agile/scrum methodologies'],
-        'education': ['bachelor’s degree in business administration', 'management', 'related field'],
-        'experience': ['experience in project management'],
-        'optional': ['PMP certification', 'track record of delivering projects on time and within budget']
-    },
-    'UI/UX Designer': {
-        'programming_languages': [],
-        'other_skills': ['adobe xd', 'sketch', 'figma', 'user-centered design principles', 'wireframes', 'prototypes', 'communication'],
-        'education': ['bachelor’s degree in design', 'fine arts', 'related field'],
-        'experience': ['experience in UI/UX design'],
-        'optional': ['knowledge of HTML/CSS', 'portfolio']
-    },
-    'DevOps Engineer': {
-        'programming_languages': ['python', 'ruby', 'go', 'bash'],
-        'other_skills': ['aws', 'azure', 'google cloud', 'docker', 'kubernetes', 'ci/cd pipelines', 'terraform', 'ansible', 'prometheus', 'grafana'],
-        'education': ['bachelor’s degree in computer science', 'engineering', 'related field'],
-        'experience': ['experience in software development and system operations'],
-        'optional': ['AWS Certified DevOps Engineer', 'problem-solving skills']
-    },
-    'Marketing Specialist': {
-        'programming_languages': [],
-        'other_skills': ['google analytics', 'seo tools', 'social media platforms', 'content creation', 'communication', 'writing', 'analytical skills'],
-        'education': ['bachelor’s degree in marketing', 'communications', 'related field'],
-        'experience': ['previous experience or internships in marketing'],
-        'optional': ['portfolio of marketing campaigns', 'knowledge of marketing trends and best practices']
-    },
-    'Human Resources Manager': {
-        'programming_languages': [],
-        'other_skills': ['interpersonal skills', 'communication', 'hr software', 'workday', 'adp', 'labor laws', 'recruitment', 'onboarding', 'conflict resolution', 'organizational skills'],
-        'education': ['bachelor’s degree in human resources', 'business administration', 'related field'],
-        'experience': ['previous HR experience'],
-        'optional': ['SHRM-CP', 'PHR certifications', 'track record in managing HR functions']
-    },
-    'Financial Analyst': {
-        'programming_languages': [],
-        'other_skills': ['financial modeling', 'forecasting', 'analytical skills', 'quantitative skills', 'financial software', 'excel', 'quickbooks', 'accounting principles'],
-        'education': ['bachelor’s degree in finance', 'accounting', 'related field'],
-        'experience': ['previous experience or internships in finance'],
-        'optional': ['CFA certification', 'attention to detail']
-    },
-    'Customer Support Specialist': {
-        'programming_languages': [],
-        'other_skills': ['communication', 'interpersonal skills', 'problem-solving', 'customer support software', 'zendesk', 'salesforce', 'patience', 'empathy', 'high-stress situations'],
-        'education': ['high school diploma or equivalent; bachelor’s degree preferred'],
-        'experience': ['previous experience in customer service or support'],
-        'optional': ['multilingual abilities', 'track record of resolving customer issues']
-    },
-    'Cybersecurity Analyst': {
-        'programming_languages': [],
-        'other_skills': ['security tools', 'firewalls', 'IDS/IPS', 'network security', 'protocols', 'regulatory standards', 'GDPR', 'HIPAA', 'vulnerability assessments', 'penetration testing'],
-        'education': ['bachelor’s degree in cybersecurity', 'computer science', 'related field'],
-        'experience': ['previous experience in cybersecurity roles'],
-        'optional': ['CISSP', 'CEH certifications', 'attention to detail', 'investigative skills']
-    },
-    'Field Technician': {
-        'programming_languages': [],
-        'other_skills': ['mechanical aptitude', 'problem-solving skills', 'communication', 'teamwork'],
-        'education': ['high school diploma or equivalent', 'technical certification'],
-        'experience': ['previous experience in field work or related technical role'],
-        'optional': ['certifications in relevant field']
-    },
-    'Project Engineer': {
-        'programming_languages': [],
-        'other_skills': ['project management', 'engineering principles', 'communication', 'teamwork', 'problem-solving skills'],
-        'education': ['bachelor’s degree in engineering', 'related field'],
-        'experience': ['experience in project management or engineering projects'],
-        'optional': ['PMP certification', 'relevant engineering certifications']
-    },
-    'Senior Project Manager': {
-        'programming_languages': [],
-        'other_skills': ['advanced project management', 'leadership', 'risk management', 'budgeting', 'communication', 'teamwork'],
-        'education': ['bachelor’s degree in engineering', 'project management', 'related field'],
-        'experience': ['extensive experience in project management'],
-        'optional': ['PMP certification', 'track record of successful project delivery']
-    },
-    'Chief Operations Officer (COO)': {
-        'programming_languages': [],
-        'other_skills': ['executive leadership', 'strategic planning', 'financial acumen', 'communication', 'teamwork', 'problem-solving skills'],
-        'education': ['bachelor’s degree in business administration', 'engineering', 'related field'],
-        'experience': ['significant executive experience in operations management'],
-        'optional': ['MBA', 'track record of improving operational efficiency']
-    },
-    'Operator': {
-        'programming_languages': [],
-        'other_skills': ['mechanical aptitude', 'equipment operation', 'communication', 'teamwork'],
-        'education': ['high school diploma or equivalent'],
-        'experience': ['previous experience as an operator or in a similar role'],
-        'optional': ['certifications in equipment operation']
-    },
-    'Electrical Engineer': {
-        'programming_languages': [],
-        'other_skills': ['electrical engineering principles', 'problem-solving skills', 'communication', 'teamwork'],
-        'education': ['bachelor’s degree in electrical engineering', 'related field'],
-        'experience': ['experience in electrical engineering'],
-        'optional': ['PE license', 'relevant certifications']
-    },
-    'Mechanical Engineer': {
-        'programming_languages': [],
-        'other_skills': ['mechanical engineering principles', 'problem-solving skills', 'communication', 'teamwork'],
-        'education': ['bachelor’s degree in mechanical engineering', 'related field'],
-        'experience': ['experience in mechanical engineering'],
-        'optional': ['PE license', 'relevant certifications']
-    },
-    'Drilling Supervisor': {
-        'programming_languages': [],
-        'other_skills': ['drilling operations', 'leadership', 'problem-solving skills', 'communication', 'teamwork'],
-        'education': ['bachelor’s degree in engineering', 'related field'],
-        'experience': ['experience in drilling operations'],
-        'optional': ['relevant certifications', 'track record of successful drilling projects']
-    },
-    'Senior Electrical Engineer': {
-        'programming_languages': [],
-        'other_skills': ['advanced electrical engineering principles', 'leadership', 'problem-solving skills', 'communication', 'teamwork'],
-        'education': ['bachelor’s degree in electrical engineering', 'related field'],
-        'experience': ['extensive experience in electrical engineering'],
-        'optional': ['PE license', 'relevant certifications']
-    },
-    'Chief Executive Officer (CEO)': {
-        'programming_languages': [],
-        'other_skills': ['executive leadership', 'strategic planning', 'financial acumen', 'communication', 'teamwork', 'problem-solving skills'],
-        'education': ['bachelor’s degree in business administration', 'engineering', 'related field'],
-        'experience': ['significant executive experience in operations management'],
-        'optional': ['MBA', 'track record of successful company leadership']
-    },
-    'Site Assistant': {
-        'programming_languages': [],
-        'other_skills': ['site management', 'communication', 'teamwork', 'problem-solving skills'],
-        'education': ['high school diploma or equivalent'],
-        'experience': ['previous experience in site management or related field'],
-        'optional': ['certifications in site management']
-    },
-    'Site Engineer': {
-        'programming_languages': [],
-        'other_skills': ['site management', 'engineering principles', 'communication', 'teamwork', 'problem-solving skills'],
-        'education': ['bachelor’s degree in engineering', 'related field'],
-        'experience': ['experience in site engineering'],
-        'optional': ['PE license', 'relevant certifications']
-    },
-    'Senior Site Engineer': {
-        'programming_languages': [],
-        'other_skills': ['advanced site management', 'engineering principles', 'leadership', 'communication', 'teamwork', 'problem-solving skills'],
-        'education': ['bachelor’s degree in engineering', 'related field'],
-        'experience': ['extensive experience in site engineering'],
-        'optional': ['PE license', 'relevant certifications']
-    },
-    'Chief Engineering Officer': {
-        'programming_languages': [],
-        'other_skills': ['executive leadership', 'strategic planning', 'financial acumen', 'communication', 'teamwork', 'problem-solving skills'],
-        'education': ['bachelor’s degree in engineering', 'related field'],
-        'experience': ['significant executive experience in engineering management'],
-        'optional': ['MBA', 'track record of successful engineering projects']
-    },
-    'Sales Associate': {
-        'programming_languages': [],
-        'other_skills': ['customer service', 'sales techniques', 'communication', 'interpersonal skills', 'product knowledge'],
-        'education': ['high school diploma or equivalent'],
-        'experience': ['previous retail or sales experience'],
-        'optional': ['multilingual abilities', 'track record of achieving sales targets']
-    },
-    'Store Manager': {
-        'programming_languages': [],
-        'other_skills': ['retail management', 'leadership', 'inventory management', 'budgeting', 'customer service', 'communication'],
-        'education': ['bachelor’s degree in business administration', 'related field'],
-        'experience': ['experience in retail management'],
-        'optional': ['track record of improving store performance']
-    },
-    'Regional Manager': {
-        'programming_languages': [],
-        'other_skills': ['multi-store management', 'leadership', 'strategic planning', 'budgeting', 'communication', 'teamwork'],
-        'education': ['bachelor’s degree in business administration', 'related field'],
-        'experience': ['significant experience in retail management'],
-        'optional': ['track record of managing multiple locations']
-    },
-    'Director of Retail Operations': {
-        'programming_languages': [],
-        'other_skills': ['executive leadership', 'strategic planning', 'financial acumen', 'communication', 'teamwork', 'problem-solving skills'],
-        'education': ['bachelor’s degree in business administration', 'related field'],
-        'experience': ['extensive experience in retail management'],
-        'optional': ['MBA', 'track record of successful retail operations management']
-    }
-    # same as before
-}
-
-general_requirements = {
-    'programming_languages': [],
-    'other_skills': ['communication', 'problem-solving', 'teamwork', 'adaptability', 'time management'],
-    'education': ['bachelor’s degree in any field'],
-    'experience': ['previous relevant experience'],
-    'optional': []
-}
 
 def calculate_match_percentage(candidate_skills, required_skills, general_skills, years_of_experience):
-    candidate_skills_set = set(skill.strip().lower() for skill in candidate_skills.split(','))
-    required_skills_set = set(skill.strip().lower() for skill in required_skills)
+    # candidate_skills are canonical skills from SkillTokenizer.tokenize; required_skills/general_skills
+    # are the normalized frozensets from CompiledRequirements
+    candidate_skills_set = set(candidate_skills)
 
-    if required_skills_set:
-        match_count = len(candidate_skills_set.intersection(required_skills_set))
-        skill_match_percentage = (match_count / len(required_skills_set)) * 100
+    if required_skills:
+        match_count = len(candidate_skills_set.intersection(required_skills))
+        skill_match_percentage = (match_count / len(required_skills)) * 100
     else:
-        general_skills_set = set(skill.strip().lower() for skill in general_skills)
-        match_count = len(candidate_skills_set.intersection(general_skills_set))
-        skill_match_percentage = (match_count / len(general_skills_set)) * 100 if general_skills_set else 0
+        match_count = len(candidate_skills_set.intersection(general_skills))
+        skill_match_percentage = (match_count / len(general_skills)) * 100 if general_skills else 0
 
     experience_match_percentage = min(years_of_experience / 10, 100)
     return (skill_match_percentage + experience_match_percentage) / 2
@@ -245,23 +47,25 @@ def evaluate_other_skills(candidate_skills, required_skills, general_skills):
     return calculate_match_percentage(candidate_skills, required_skills, general_skills, 0)
 
 def evaluate_education(candidate_education, required_education):
-    if any(fuzz.partial_ratio(candidate_education.lower(), edu.lower()) > 80 for edu in required_education):
+    if matches_any(candidate_education.lower(), required_education):
         return 100
     return 0
 
 def evaluate_experience(candidate_experience, required_experience):
-    if any(fuzz.partial_ratio(str(candidate_experience).lower(), exp.lower()) > 80 for exp in required_experience):
+    if matches_any(str(candidate_experience).lower(), required_experience):
         return 100
     return 0
 
 def calculate_overall_match(candidate_row, job_requirements, general_requirements):
-    job_title = candidate_row['Job Title You Are Applying For \'If Not Write in Other\'']
-    job_specific_requirements = job_requirements.get(job_title, general_requirements)
+    requirements = compile_row_requirements(job_requirements, general_requirements)
+    job_specific_requirements = requirements.profile(candidate_row[JOB_TITLE_COLUMN])
+    # Tokenized once for both skill evaluations
+    candidate_skills = requirements.tokenizer.tokenize(candidate_row['Skillset'])
 
-    programming_languages_match = evaluate_programming_languages(candidate_row['Skillset'], job_specific_requirements['programming_languages'], general_requirements['programming_languages'])
-    other_skills_match = evaluate_other_skills(candidate_row['Skillset'], job_specific_requirements['other_skills'], general_requirements['other_skills'])
-    education_match = evaluate_education(candidate_row['Education'], job_specific_requirements['education'])
-    experience_match = evaluate_experience(candidate_row['Years of Experience'], job_specific_requirements['experience'])
+    programming_languages_match = evaluate_programming_languages(candidate_skills, job_specific_requirements.programming_languages, requirements.general.programming_languages)
+    other_skills_match = evaluate_other_skills(candidate_skills, job_specific_requirements.other_skills, requirements.general.other_skills)
+    education_match = evaluate_education(candidate_row['Education'], job_specific_requirements.education)
+    experience_match = evaluate_experience(candidate_row['Years of Experience'], job_specific_requirements.experience)
 
     overall_match = (
         programming_languages_match +
@@ -273,73 +77,160 @@ def calculate_overall_match(candidate_row, job_requirements, general_requirement
     return overall_match
 
 def get_latest_file_with_keyword(folder_path, keyword):
-    files = glob.glob(os.path.join(folder_path, f"*{keyword}*.xlsx"))
-    if not files:
+    latest_file = directory_index.latest(folder_path, keyword)
+    if latest_file is None:
         raise FileNotFoundError(f"No files found with keyword '{keyword}' in folder '{folder_path}'")
-    latest_file = max(files, key=os.path.getctime)
     return latest_file
 
-def process_applications(folder_path, job_requirements, general_requirements):
-    latest_application_file = get_latest_file_with_keyword(folder_path, "Application")
-    df = pd.read_excel(latest_application_file)
-
-    df['Match Percentage'] = df.apply(lambda row: calculate_overall_match(row, job_requirements, general_requirements), axis=1)
-    df['Age'] = datetime.datetime.now().year - pd.to_datetime(df['Birth Date'], dayfirst=True).dt.year
-
-    clusters = df.groupby('Job Title You Are Applying For \'If Not Write in Other\'')
-
-    output_file_path = 'sorted_candidates.xlsx'
-
-    with pd.ExcelWriter(output_file_path) as writer:
-        for job_title, group in clusters:
-            sorted_group = group.sort_values(by='Match Percentage', ascending=False)
-            safe_sheet_name = job_title.replace('/', '_').replace('\\', '_').replace(':', '_').replace('*', '_').replace('?', '_').replace('[', '_').replace(']', '_')
-            sorted_group = sorted_group.drop(columns=['Birth Date'])
-            sorted_group.to_excel(writer, sheet_name=safe_sheet_name, index=False)
-
-    print(f"Sorted candidates file created and saved as '{output_file_path}'.")
-
-    return output_file_path
+def process_applications(folder_path, job_requirements, general_requirements, **options):
+    # pipeline.process_applications, where unknown job titles fall back to general_requirements
+    return run_pipeline(folder_path, job_requirements, general_requirements, general_fallback=True, **options)
 
 def save_processed_data(df, output_path):
     # Save the DataFrame to an Excel file
     df.to_excel(output_path, index=False, engine='openpyxl')
 
-def update_model(new_hires_folder_path):
-    try:
-        latest_hiring_file = get_latest_file_with_keyword(new_hires_folder_path, "hired")
-    except FileNotFoundError as e:
-        print(e)
-        return
-
-    hiring_df = pd.read_excel(latest_hiring_file)
-    new_hires = hiring_df[hiring_df['Hired'].str.lower() == 'yes']
-
-    if new_hires.empty:
-        print("No new hires to update the model.")
-        return
-
-    vectorizer = joblib.load('vectorizer.pkl')
-    pipeline = joblib.load('regressor_model.pkl')
-
-    new_hires['Age'] = datetime.now().year - pd.to_datetime(new_hires['Birth Date']).dt.year
-    new_hires['Match Percentage'] = new_hires.apply(lambda row: calculate_overall_match(row, job_requirements, general_requirements), axis=1)
-    new_X = pd.concat([pd.DataFrame(vectorizer.transform(new_hires['Skillset']).toarray(), columns=vectorizer.get_feature_names_out()), new_hires[['Age']]], axis=1)
-    new_y = new_hires['Match Percentage']
-
-    original_X = pd.read_pickle('X_train.pkl')
-    original_y = pd.read_pickle('y_train.pkl')
-
-    combined_X = pd.concat([original_X, new_X], ignore_index=True)
-    combined_y = pd.concat([original_y, new_y], ignore_index=True)
-
-    pipeline.fit(combined_X, combined_y)
+def seed_training_history(history, vectorizer):
+    # Starts the history with the rows X_train.pkl/y_train.pkl were built from, rebuilt from their
+    # skill counts. Returns False, seeding nothing, when the rebuilt rows would not give back the same features.
+    # joblib.load reads these whether they were written by pandas or by joblib.dump in update_model
+    original_X = joblib.load('X_train.pkl')
+    original_y = joblib.load('y_train.pkl')
+    rows = pd.DataFrame({
+        'Skillset': skillsets_from_features(vectorizer, original_X),
+        'Age': original_X['Age'].to_numpy(dtype=np.float64),
+        'Match Percentage': original_y.to_numpy(),
+    })
+    rebuilt_X = build_features(vectorizer, rows)
+    if list(rebuilt_X.columns) != list(original_X.columns) or not np.allclose(rebuilt_X.to_numpy(dtype=np.float64), original_X.to_numpy(dtype=np.float64), equal_nan=True):
+        return False
+    history.append(rows)
+    print(f"Training history seeded with {len(rows)} rows from X_train.pkl.")
+    return True
+
+def update_hashed_model(history, new_hires, incremental, tokenizer):
+    # Hashed sparse features need no fitted vocabulary, so the model can be retrained from the raw
+    # shards and unseen skills still get their own columns. It trains from the same history as the
+    # CountVectorizer model (new_hires already appended), and is fitted on all of it the first time.
+    if incremental and os.path.exists(HASHED_MODEL_PATH):
+        pipeline = joblib.load(HASHED_MODEL_PATH)
+
+        def reservoir_training_set():
+            sample = history.reservoir()
+            return hashed_features(sample, tokenizer), sample['Match Percentage']
+
+        mode = incremental_fit(pipeline, hashed_features(new_hires, tokenizer), new_hires['Match Percentage'], reservoir_training_set)
+        print(f"Hashed-feature model updated incrementally ({mode}).")
+    else:
+        pipeline = make_hashed_pipeline()
+        training_rows = history.read()
+        pipeline.fit(hashed_features(training_rows, tokenizer), training_rows['Match Percentage'])
+        print(f"Hashed-feature model retrained on the {len(training_rows)} hires recorded in '{history.directory}'.")
 
-    joblib.dump(pipeline, 'updated_regressor_model.pkl')
-    joblib.dump(combined_X, 'X_train.pkl')
-    joblib.dump(combined_y, 'y_train.pkl')
+    joblib.dump(pipeline, HASHED_MODEL_PATH)
 
-    print("Model updated with new hiring data and saved.")
+def read_hiring_file(hiring_file, hiring_store_path=HIRING_STORE_PATH):
+    # The workbook is appended to the hiring store (once, keyed on its contents) and read back from
+    # it in chunks, keeping only the hires
+    store = HiringStore(hiring_store_path)
+    try:
+        store.append_workbook(hiring_file)
+        rows = 0
+        chunks = []
+        for chunk in store.iter_rows(batch_key=content_digest(hiring_file)):
+            rows += len(chunk)
+            chunks.append(chunk[chunk['Hired'].str.lower() == 'yes'].drop(columns=[ROW_ID_COLUMN, BATCH_COLUMN]))
+    finally:
+        store.close()
+    return (pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()), rows
+
+def update_model(new_hires_folder_path, incremental=False, history_dir=TRAINING_HISTORY_DIR, use_hashed_features=USE_HASHED_FEATURES, hiring_store_path=HIRING_STORE_PATH):
+    with pipeline_run('update_model') as run:
+        run.stage('discovery')
+        try:
+            latest_hiring_file = get_latest_file_with_keyword(new_hires_folder_path, "hired")
+        except FileNotFoundError as e:
+            print(e)
+            return
+        # Each hiring file is added to the training history once
+        history = TrainingHistory(history_dir)
+        batch_key = content_digest(latest_hiring_file)
+        if history.has_batch(batch_key):
+            print(f"The hires in '{latest_hiring_file}' have already been used to update the model.")
+            return
+
+        run.stage('parse')
+        new_hires, rows = read_hiring_file(latest_hiring_file, hiring_store_path)
+        run.rows(rows)
+
+        if new_hires.empty:
+            print("No new hires to update the model.")
+            return
+
+        run.stage('score', len(new_hires))
+        requirements = compile_requirements(job_requirements, general_requirements)
+        new_hires['Age'] = birth_date_ages(new_hires['Birth Date'])
+        new_hires['Match Percentage'] = score_applications(new_hires, requirements)
+
+        run.stage('load_model')
+        vectorizer = joblib.load('vectorizer.pkl')
+        # Incremental updates build on the last updated model instead of the original one
+        model_path = 'updated_regressor_model.pkl' if incremental and os.path.exists('updated_regressor_model.pkl') else 'regressor_model.pkl'
+        pipeline = joblib.load(model_path)
+
+        run.stage('history', len(new_hires))
+        # Both modes train from the one history: the incremental mode on its reservoir, the full refit on
+        # all of it. It starts out with the rows X_train.pkl/y_train.pkl were built from; if those cannot
+        # be rebuilt, the history stays unused and updates keep refitting on X_train.pkl + the new hires.
+        history_ready = bool(history.shard_paths()) or not os.path.exists('X_train.pkl') or seed_training_history(history, vectorizer)
+        if history_ready:
+            history.append(new_hires, batch_key)
+        elif incremental:
+            print("Could not rebuild the training history from X_train.pkl; refitting on the full training set instead.")
+            incremental = False
+
+        run.stage('features', len(new_hires))
+        new_X = build_features(vectorizer, new_hires)
+        new_y = new_hires['Match Percentage'].reset_index(drop=True)
+
+        if incremental:
+            def reservoir_training_set():
+                sample = history.reservoir()
+                return build_features(vectorizer, sample), sample['Match Percentage']
+
+            run.stage('train', len(new_hires))
+            mode = incremental_fit(pipeline, new_X, new_y, reservoir_training_set)
+            joblib.dump(pipeline, 'updated_regressor_model.pkl')
+            print(f"Model updated incrementally ({mode}) with new hiring data and saved.")
+        else:
+            if history_ready:
+                # X_train.pkl/y_train.pkl are rewritten from the history below, so they stay in step with it
+                training_rows = history.read()
+                combined_X = build_features(vectorizer, training_rows)
+                combined_y = training_rows['Match Percentage'].reset_index(drop=True)
+            else:
+                # joblib.load, since joblib.dump below writes them in its own format
+                original_X = joblib.load('X_train.pkl')
+                original_y = joblib.load('y_train.pkl')
+                combined_X = pd.concat([original_X, new_X], ignore_index=True)
+                combined_y = pd.concat([original_y, new_y], ignore_index=True)
+
+            run.stage('train', len(combined_X))
+            pipeline.fit(combined_X, combined_y)
+
+            run.stage('save', len(combined_X))
+            joblib.dump(pipeline, 'updated_regressor_model.pkl')
+            joblib.dump(combined_X, 'X_train.pkl')
+            joblib.dump(combined_y, 'y_train.pkl')
+
+            print("Model updated with new hiring data and saved.")
+
+        if use_hashed_features:
+            if history_ready:
+                run.stage('hashed_model', len(new_hires))
+                update_hashed_model(history, new_hires, incremental, requirements.tokenizer)
+            else:
+                print("The hashed-feature model is not updated: it needs the training history, which could not be rebuilt from X_train.pkl.")
 
 def hiring_data_page():
     return render_template('hiring_data_page.html')
@@ -0,0 +1,84 @@
+import datetime
+import os
+
+import numpy as np
+import pandas as pd
+
+from compact import compact_ages
+
+# Day-first formats come before their month-first twins when BIRTH_DATE_DAYFIRST is set (the default),
+# so a file whose dates are all ambiguous (day <= 12) is read the same way by app.py and data_processing.py
+BIRTH_DATE_DAYFIRST = os.environ.get('BIRTH_DATE_DAYFIRST', '1') == '1'
+DAY_FIRST_FORMATS = ['%d/%m/%Y', '%d-%m-%Y', '%d.%m.%Y', '%d/%m/%y']
+MONTH_FIRST_FORMATS = ['%m/%d/%Y', '%m-%d-%Y', '%m.%d.%Y', '%m/%d/%y']
+UNAMBIGUOUS_FORMATS = [
+    '%Y-%m-%d %H:%M:%S', '%Y-%m-%d', '%Y/%m/%d', '%Y-%m-%dT%H:%M:%S',
+    '%d %b %Y', '%d %B %Y', '%b %d, %Y', '%B %d, %Y',
+]
+DETECTION_SAMPLE_SIZE = 1000
+REPORTED_EXAMPLES = 5
+
+
+class BirthDateParser:
+    # Parses one file's Birth Date column with fixed formats instead of per-value inference.
+    # The format is detected from a sample of the distinct strings on first use and reused for
+    # later chunks of the same file; another format is only looked for when values fail all known ones.
+
+    def __init__(self, dayfirst=BIRTH_DATE_DAYFIRST):
+        ambiguous = DAY_FIRST_FORMATS + MONTH_FIRST_FORMATS if dayfirst else MONTH_FIRST_FORMATS + DAY_FIRST_FORMATS
+        self.candidate_formats = UNAMBIGUOUS_FORMATS + ambiguous
+        self.formats = []
+
+    def _detect(self, strings):
+        sample = strings.iloc[:DETECTION_SAMPLE_SIZE]
+        parsed_counts = [
+            (pd.to_datetime(sample, format=date_format, errors='coerce').notna().sum(), date_format)
+            for date_format in self.candidate_formats if date_format not in self.formats
+        ]
+        # Most values parsed wins; sorted() is stable, so ties keep the day-first/month-first preference
+        best = sorted(parsed_counts, key=lambda count_and_format: -count_and_format[0])
+        return [date_format for count, date_format in best if count]
+
+    def _parse_strings(self, strings):
+        parsed = pd.Series(pd.NaT, index=strings.index, dtype='datetime64[ns]')
+        for attempt in range(2):
+            for date_format in self.formats:
+                missing = parsed.isna()
+                if not missing.any():
+                    return parsed
+                parsed[missing] = pd.to_datetime(strings[missing], format=date_format, errors='coerce')
+            missing = parsed.isna()
+            if attempt or not missing.any():
+                break
+            self.formats.extend(self._detect(strings[missing]))
+        return parsed
+
+    def parse(self, values):
+        # Returns (datetime64 Series aligned with values, mask of present values that could not be parsed)
+        values = pd.Series(values)
+        if pd.api.types.is_datetime64_any_dtype(values.dtype):
+            return values, pd.Series(False, index=values.index)
+        # Each distinct value is parsed once; a categorical column already holds them as categories
+        codes, uniques = pd.factorize(values)
+        uniques = pd.Series(np.asarray(uniques, dtype=object))
+        parsed = pd.Series(pd.NaT, index=uniques.index, dtype='datetime64[ns]')
+        is_date = uniques.map(lambda value: isinstance(value, (datetime.date, np.datetime64)))
+        if is_date.any():
+            parsed[is_date] = pd.to_datetime(uniques[is_date])
+        is_text = uniques.map(lambda value: isinstance(value, str))
+        if is_text.any():
+            parsed[is_text] = self._parse_strings(uniques[is_text].str.strip())
+        dates = pd.Series(np.append(parsed.to_numpy(), np.datetime64('NaT', 'ns'))[codes], index=values.index)
+        return dates, dates.isna() & values.notna()
+
+
+def birth_date_ages(birth_dates, parser=None, as_of=None):
+    # Age in whole years, as an Int16 array with <NA> for missing or unparseable dates.
+    # Unparseable values are reported instead of aborting the run.
+    parser = parser or BirthDateParser()
+    dates, failed = parser.parse(birth_dates)
+    if failed.any():
+        examples = ', '.join(repr(str(value)) for value in pd.unique(pd.Series(birth_dates)[failed].astype(str))[:REPORTED_EXAMPLES])
+        print(f"{int(failed.sum())} Birth Date values could not be parsed and have no Age (e.g. {examples}).")
+    as_of = as_of or datetime.date.today()
+    return compact_ages(as_of.year - dates.dt.year)
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.impute import SimpleImputer
+from sklearn.linear_model import SGDRegressor
+from sklearn.pipeline import make_pipeline
+
+from skill_index import default_tokenizer
+
+# Fixed width, so new skills never require refitting and memory does not grow with the vocabulary
+N_SKILL_FEATURES = 2 ** 18
+AGE_SCALE = 100.0
+HASHED_MODEL_PATH = 'hashed_regressor_model.pkl'
+
+
+def build_features(vectorizer, df):
+    # Column layout the CountVectorizer models (vectorizer.pkl/regressor_model.pkl) were trained on;
+    # Age goes in as float64 so a missing (<NA>) age reaches the imputer as NaN
+    return pd.concat([pd.DataFrame(vectorizer.transform(df['Skillset']).toarray(), columns=vectorizer.get_feature_names_out()), df[['Age']].astype(np.float64).reset_index(drop=True)], axis=1)
+
+def skillsets_from_features(vectorizer, X):
+    # Inverse of the skill columns of build_features: each term joined in as often as it was counted
+    terms = vectorizer.get_feature_names_out()
+    counts = sparse.csr_matrix(X[terms].to_numpy())
+    return pd.Series([', '.join(term for column, count in zip(counts.indices[start:end], counts.data[start:end]) for term in [terms[column]] * int(count))
+                      for start, end in zip(counts.indptr[:-1], counts.indptr[1:])], index=X.index)
+
+def skill_hasher(tokenizer):
+    # Hashes the canonical skills scoring credits, so aliases and versioned spellings share a column
+    return HashingVectorizer(
+        analyzer=tokenizer.tokenize, n_features=N_SKILL_FEATURES,
+        alternate_sign=False, binary=True, norm=None, dtype=np.float64,
+    )
+
+def hashed_features(df, tokenizer=None):
+    # CSR matrix: one hashed column per canonical skill, plus Age scaled to roughly [0, 1] in the last column
+    skills = skill_hasher(tokenizer or default_tokenizer()).transform(df['Skillset'].astype(object).fillna(''))
+    age = sparse.csr_matrix(df[['Age']].astype(np.float64).to_numpy() / AGE_SCALE)
+    return sparse.hstack([skills, age], format='csr')
+
+def make_hashed_pipeline():
+    # Both steps accept CSR input, so features stay sparse all the way into the regressor
+    return make_pipeline(SimpleImputer(), SGDRegressor(random_state=0))
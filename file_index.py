@@ -0,0 +1,95 @@
+import fnmatch
+import os
+import threading
+import time
+
+# Some network shares only keep directory mtimes to ~2 seconds; a directory that changed
+# this recently is rescanned even if its mtime looks unchanged.
+MTIME_GRANULARITY_NS = 2_000_000_000
+# How stale a cached file timestamp may get: a workbook overwritten in place changes its own
+# ctime but not the folder's mtime, so the cached names are re-stat'ed at most this often
+RESTAT_INTERVAL_NS = int(float(os.environ.get('FILE_INDEX_RESTAT_SECONDS', 30)) * 1e9)
+
+
+class DirectoryIndex:
+    # Caches the *.xlsx files of each folder with their timestamps. A lookup stats only the folder:
+    # it is listed again when its own mtime changes (files added, removed or renamed). A workbook
+    # overwritten in place does not change that mtime, so the cached names are re-stat'ed once
+    # RESTAT_INTERVAL_NS has passed; until then latest() may still return the previous newest file.
+    # Files are ordered by ctime, the same key get_latest_file_with_keyword has always used.
+
+    def __init__(self, extension='.xlsx'):
+        self.extension = extension
+        self._lock = threading.Lock()
+        self._folders = {}
+
+    def _scan(self, folder_path):
+        timestamps = {}
+        with os.scandir(folder_path) as entries:
+            for entry in entries:
+                name = entry.name
+                if name.startswith('.') or not name.lower().endswith(self.extension):
+                    continue
+                try:
+                    if entry.is_file():
+                        timestamps[name] = entry.stat().st_ctime
+                except FileNotFoundError:
+                    continue
+        return timestamps
+
+    def _restat(self, folder_path, cached):
+        # Keyword matches are only re-sorted when a timestamp moved or a file went missing
+        cached['restated_at_ns'] = time.time_ns()
+        timestamps = {}
+        for name in cached['timestamps']:
+            try:
+                timestamps[name] = os.stat(os.path.join(folder_path, name)).st_ctime
+            except FileNotFoundError:
+                continue
+        if timestamps != cached['timestamps']:
+            cached['timestamps'] = timestamps
+            cached['by_keyword'] = {}
+
+    def _folder(self, folder_path):
+        folder_mtime_ns = os.stat(folder_path).st_mtime_ns
+        cached = self._folders.get(folder_path)
+        if (cached is not None and cached['mtime_ns'] == folder_mtime_ns
+                and cached['scanned_at_ns'] - folder_mtime_ns > MTIME_GRANULARITY_NS):
+            if time.time_ns() - cached['restated_at_ns'] >= RESTAT_INTERVAL_NS:
+                self._restat(folder_path, cached)
+            return cached
+        scanned_at_ns = time.time_ns()
+        cached = {
+            'mtime_ns': folder_mtime_ns,
+            'scanned_at_ns': scanned_at_ns,
+            'restated_at_ns': scanned_at_ns,
+            'timestamps': self._scan(folder_path),
+            'by_keyword': {},
+        }
+        self._folders[folder_path] = cached
+        return cached
+
+    def _matches(self, folder_path, keyword):
+        folder_path = os.path.abspath(folder_path)
+        with self._lock:
+            cached = self._folder(folder_path)
+            matches = cached['by_keyword'].get(keyword)
+            if matches is None:
+                # Same pattern as glob('*{keyword}*.xlsx'), newest first
+                pattern = os.path.normcase(f"*{keyword}*{self.extension}")
+                names = [name for name in cached['timestamps'] if fnmatch.fnmatchcase(os.path.normcase(name), pattern)]
+                names.sort(key=cached['timestamps'].__getitem__, reverse=True)
+                matches = cached['by_keyword'][keyword] = [(os.path.join(folder_path, name), cached['timestamps'][name]) for name in names]
+        return matches
+
+    def files(self, folder_path, keyword, since=None, until=None):
+        # since/until are POSIX timestamps bounding the same ctime the files are ordered by (until exclusive)
+        return [path for path, timestamp in self._matches(folder_path, keyword)
+                if (since is None or timestamp >= since) and (until is None or timestamp < until)]
+
+    def latest(self, folder_path, keyword):
+        matches = self._matches(folder_path, keyword)
+        return matches[0][0] if matches else None
+
+
+directory_index = DirectoryIndex()
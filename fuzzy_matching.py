@@ -0,0 +1,41 @@
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+# fuzzywuzzy runs on the C Levenshtein matcher when python-Levenshtein is installed.
+# rapidfuzz is faster still, but its partial_ratio disagrees with fuzzywuzzy on some inputs.
+from fuzzywuzzy import fuzz
+
+MATCH_THRESHOLD = 80
+FUZZY_CACHE_SIZE = int(os.environ.get('FUZZY_CACHE_SIZE', 65536))
+
+
+@lru_cache(maxsize=FUZZY_CACHE_SIZE)
+def matches_any(value, requirements):
+    # value is already lowercased; requirements is a lowercased tuple from CompiledRequirements
+    return any(fuzz.partial_ratio(value, requirement) > MATCH_THRESHOLD for requirement in requirements)
+
+def match_column(values, title_positions, requirements_per_title):
+    # Score every distinct (value, title) pair once and broadcast the result back to the rows
+    if len(title_positions) == 0:
+        return np.zeros(0, dtype=np.float64)
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    lowered = [str(value).lower() for value in uniques]
+    pairs, inverse = np.unique(codes.astype(np.int64) * len(requirements_per_title) + title_positions, return_inverse=True)
+    value_codes, positions = np.divmod(pairs, len(requirements_per_title))
+    pair_scores = np.fromiter(
+        (100.0 if matches_any(lowered[code], requirements_per_title[position]) else 0.0
+         for code, position in zip(value_codes, positions)),
+        dtype=np.float64, count=len(pairs))
+    return pair_scores[inverse.ravel()]
+
+def match_matrix(values, requirements_per_title):
+    # values x titles: each distinct value is scored once per title, however many rows share it
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    lowered = [str(value).lower() for value in uniques]
+    unique_scores = np.array([
+        [100.0 if matches_any(value, requirements) else 0.0 for requirements in requirements_per_title]
+        for value in lowered
+    ], dtype=np.float64).reshape(len(lowered), len(requirements_per_title))
+    return unique_scores[codes]
@@ -0,0 +1,114 @@
+import datetime
+import os
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+from parse_cache import content_digest
+from settings import HIRING_STORE_PATH
+
+# Bookkeeping columns; workbook columns are stored under their own names next to them
+ROW_ID_COLUMN = '_row_id'
+BATCH_COLUMN = '_batch'
+HIRING_READ_CHUNK_ROWS = int(os.environ.get('HIRING_READ_CHUNK_ROWS', 50000))
+
+
+def quote_identifier(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+def sql_value(value):
+    # NaN/NaT become NULL, timestamps ISO text, numpy scalars plain Python values
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if isinstance(value, (pd.Timestamp, datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class HiringStore:
+    # Append-only table of hired candidates. Each batch is appended in one BEGIN IMMEDIATE
+    # transaction, which takes SQLite's write lock up front, so concurrent updates queue up
+    # instead of overwriting each other. WAL mode lets readers keep reading while a batch is written.
+    # Columns seen for the first time are added with ALTER TABLE; older rows read them as NULL.
+    # Reads are lazy: iter_rows() yields bounded chunks, seeking on the row ID from one to the next.
+
+    def __init__(self, path=HIRING_STORE_PATH, timeout=30):
+        self.connection = sqlite3.connect(path, timeout=timeout, isolation_level=None, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.execute(f'CREATE TABLE IF NOT EXISTS hires ({ROW_ID_COLUMN} INTEGER PRIMARY KEY AUTOINCREMENT, {BATCH_COLUMN} INTEGER NOT NULL)')
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS batches (batch_id INTEGER PRIMARY KEY AUTOINCREMENT, '
+            'batch_key TEXT UNIQUE NOT NULL, source TEXT, rows INTEGER NOT NULL, appended_at TEXT NOT NULL)')
+        self._lock = threading.Lock()
+
+    def columns(self):
+        return [row[1] for row in self.connection.execute('PRAGMA table_info(hires)')]
+
+    def has_batch(self, batch_key):
+        return self.connection.execute('SELECT 1 FROM batches WHERE batch_key = ?', (batch_key,)).fetchone() is not None
+
+    def append(self, df, batch_key, source=None):
+        # Returns the number of rows appended; a batch_key that was already appended adds nothing
+        with self._lock:
+            self.connection.execute('BEGIN IMMEDIATE')
+            try:
+                if self.has_batch(batch_key):
+                    self.connection.execute('ROLLBACK')
+                    return 0
+                existing = set(self.columns())
+                for column in df.columns:
+                    if str(column) not in existing:
+                        self.connection.execute(f'ALTER TABLE hires ADD COLUMN {quote_identifier(column)}')
+                        existing.add(str(column))
+                batch_id = self.connection.execute(
+                    'INSERT INTO batches (batch_key, source, rows, appended_at) VALUES (?, ?, ?, ?)',
+                    (batch_key, source, len(df), datetime.datetime.now().isoformat(timespec='seconds'))).lastrowid
+                column_list = ', '.join([BATCH_COLUMN] + [quote_identifier(column) for column in df.columns])
+                placeholders = ', '.join(['?'] * (len(df.columns) + 1))
+                self.connection.executemany(
+                    f'INSERT INTO hires ({column_list}) VALUES ({placeholders})',
+                    ([batch_id] + [sql_value(value) for value in row] for row in df.itertuples(index=False, name=None)))
+                self.connection.execute('COMMIT')
+            except BaseException:
+                self.connection.execute('ROLLBACK')
+                raise
+        return len(df)
+
+    def append_workbook(self, path, source=None):
+        # Keyed by the workbook's contents alone, so appending the same file twice (or a copy of it,
+        # or the same file after its mtime changed) is a no-op
+        batch_key = content_digest(path)
+        if self.has_batch(batch_key):
+            return 0
+        return self.append(pd.read_excel(path), batch_key, source or os.path.abspath(path))
+
+    def iter_rows(self, after_row_id=0, columns=None, batch_key=None, chunk_size=HIRING_READ_CHUNK_ROWS):
+        # Rows after after_row_id in the order they were appended, as DataFrames of at most chunk_size
+        # rows; batch_key limits them to one appended batch
+        selected = ', '.join([ROW_ID_COLUMN] + [quote_identifier(column) for column in columns]) if columns else '*'
+        condition = f'{ROW_ID_COLUMN} > ?'
+        params = ()
+        if batch_key is not None:
+            condition += f' AND {BATCH_COLUMN} = (SELECT batch_id FROM batches WHERE batch_key = ?)'
+            params = (batch_key,)
+        while True:
+            chunk = pd.read_sql_query(
+                f'SELECT {selected} FROM hires WHERE {condition} ORDER BY {ROW_ID_COLUMN} LIMIT ?',
+                self.connection, params=(after_row_id,) + params + (chunk_size,))
+            if len(chunk):
+                yield chunk
+            if len(chunk) < chunk_size:
+                return
+            after_row_id = int(chunk[ROW_ID_COLUMN].iloc[-1])
+
+    def read(self, after_row_id=0, columns=None):
+        chunks = list(self.iter_rows(after_row_id, columns))
+        return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=[ROW_ID_COLUMN] + list(columns or self.columns()[1:]))
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,119 @@
+import os
+import shutil
+import tempfile
+
+import pandas as pd
+
+from compiled_requirements import compile_requirements
+from dates import BIRTH_DATE_DAYFIRST, BirthDateParser, birth_date_ages
+from output_writers import DEFAULT_OUTPUT_FORMAT, output_path_for, write_groups
+from score_store import score_applications_incremental
+from shortlist import select_top
+from scoring import DEFAULT_CHUNK_SIZE, JOB_TITLE_COLUMN
+
+
+def _convert_cell(value):
+    # Same conversion pd.read_excel applies to openpyxl cells: integral floats become ints
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+def _iter_excel_chunks(path, chunk_size):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        header = [f'Unnamed: {position}' if name is None else name for position, name in enumerate(header)]
+        batch = []
+        for row in rows:
+            if all(cell is None for cell in row):
+                continue
+            batch.append([_convert_cell(cell) for cell in row])
+            if len(batch) >= chunk_size:
+                yield pd.DataFrame(batch, columns=header)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=header)
+    finally:
+        workbook.close()
+
+def _iter_parquet_chunks(path, chunk_size):
+    import pyarrow.parquet as pq
+
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+        yield batch.to_pandas()
+
+def iter_application_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    # Yields the application sheet as DataFrames of at most chunk_size rows without loading it whole
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        yield from pd.read_csv(path, chunksize=chunk_size)
+    elif extension == '.parquet':
+        yield from _iter_parquet_chunks(path, chunk_size)
+    else:
+        yield from _iter_excel_chunks(path, chunk_size)
+
+def sort_by_match(df):
+    # Stable, so candidates with equal scores keep their order in the application file
+    return df.sort_values(by='Match Percentage', ascending=False, kind='mergesort')
+
+def _keep_top(partitions, job_title, group, top_n):
+    # Previous winners go first so ties keep file order
+    if job_title in partitions:
+        group = pd.concat([partitions[job_title], group])
+    partitions[job_title] = select_top(group, top_n)
+
+def _merged_partitions(partitions, top_n):
+    for job_title in sorted(partitions):
+        if top_n is not None:
+            yield job_title, partitions[job_title]
+        else:
+            # Runs are already sorted and in file order, so a stable sort of their concatenation is a merge
+            yield job_title, sort_by_match(pd.concat([pd.read_pickle(run_path) for run_path in partitions[job_title]]))
+
+def process_application_file_streaming(application_file, job_requirements, general_requirements=None,
+                                       output_file_path=None, general_fallback=True,
+                                       dayfirst=BIRTH_DATE_DAYFIRST, chunk_size=DEFAULT_CHUNK_SIZE, top_n=None,
+                                       score_store_path=None, progress=None, output_format=DEFAULT_OUTPUT_FORMAT, min_score=None):
+    # Scores the file chunk by chunk. Without top_n every chunk's per-job partition is sorted and
+    # spilled to disk, so memory holds one chunk while scoring and one job title while writing.
+    progress = progress or (lambda stage, rows_scored=None, rows_total=None: None)
+    output_file_path = output_file_path or output_path_for(output_format)
+    requirements = compile_requirements(job_requirements, general_requirements)
+    # One parser per file, so the Birth Date format is detected once rather than per chunk
+    birth_date_parser = BirthDateParser(dayfirst)
+    rows_scored = 0
+    spill_dir = tempfile.mkdtemp(prefix='cv-filtering-')
+    partitions = {}
+    title_ids = {}
+    try:
+        for chunk_number, chunk in enumerate(iter_application_chunks(application_file, chunk_size)):
+            chunk['Match Percentage'] = score_applications_incremental(chunk, requirements, general_fallback=general_fallback, store_path=score_store_path)
+            chunk['Age'] = birth_date_ages(chunk['Birth Date'], birth_date_parser)
+            chunk = chunk.drop(columns=['Birth Date'])
+            rows_scored += len(chunk)
+            progress('scoring', rows_scored)
+            if min_score is not None:
+                chunk = chunk[chunk['Match Percentage'] >= min_score]
+
+            for job_title, group in chunk.groupby(JOB_TITLE_COLUMN):
+                if top_n is not None:
+                    _keep_top(partitions, job_title, group, top_n)
+                    continue
+                title_id = title_ids.setdefault(job_title, len(title_ids))
+                run_path = os.path.join(spill_dir, f'{title_id}-{chunk_number}.pkl')
+                sort_by_match(group).to_pickle(run_path)
+                partitions.setdefault(job_title, []).append(run_path)
+
+        progress('writing')
+        write_groups(_merged_partitions(partitions, top_n), output_file_path, output_format)
+    finally:
+        shutil.rmtree(spill_dir, ignore_errors=True)
+
+    print(f"Sorted candidates file created and saved as '{output_file_path}'.")
+
+    return output_file_path
@@ -0,0 +1,172 @@
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; peak memory is then only reported with METRICS_TRACE_MEMORY=1
+    resource = None
+
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') != '0'
+# tracemalloc gives a true per-stage peak but slows allocation-heavy code down noticeably,
+# so by default stages report the process's peak RSS so far instead
+METRICS_TRACE_MEMORY = os.environ.get('METRICS_TRACE_MEMORY', '0') == '1'
+METRIC_PREFIX = 'cv_filtering'
+
+
+def _peak_rss_bytes():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KiB elsewhere
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class _DisabledRun:
+    # Stands in for PipelineRun when metrics are disabled, so instrumented code pays only a method call
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+    def stage(self, name, rows=None):
+        pass
+
+    def rows(self, rows):
+        pass
+
+_DISABLED_RUN = _DisabledRun()
+
+
+class PipelineRun:
+    # One run of a pipeline. Stages are sequential: starting a stage ends the previous one.
+    # On exit the run is added to the registry and logged as a single JSON line.
+
+    def __init__(self, pipeline, registry):
+        self.pipeline = pipeline
+        self.registry = registry
+        self.stages = []
+        self._current = None
+        self._owns_tracing = False
+
+    def __enter__(self):
+        if METRICS_TRACE_MEMORY and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracing = True
+        self.started = time.perf_counter()
+        return self
+
+    def stage(self, name, rows=None):
+        self._end_stage()
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        self._current = {'stage': name, 'rows': rows, 'started': time.perf_counter()}
+
+    def rows(self, rows):
+        if self._current is not None:
+            self._current['rows'] = rows
+
+    def _end_stage(self):
+        current = self._current
+        if current is None:
+            return
+        seconds = time.perf_counter() - current['started']
+        rows = current['rows']
+        self.stages.append({
+            'stage': current['stage'],
+            'seconds': seconds,
+            'rows': rows,
+            'rows_per_second': rows / seconds if rows is not None and seconds > 0 else None,
+            'peak_memory_bytes': tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else _peak_rss_bytes(),
+        })
+        self._current = None
+
+    def __exit__(self, exc_type, exc, traceback):
+        self._end_stage()
+        seconds = time.perf_counter() - self.started
+        if self._owns_tracing:
+            tracemalloc.stop()
+        status = 'ok' if exc_type is None else 'error'
+        self.registry.record(self.pipeline, status, seconds, self.stages)
+        print(json.dumps({
+            'event': 'pipeline_run',
+            'pipeline': self.pipeline,
+            'status': status,
+            'seconds': round(seconds, 6),
+            'stages': [{key: round(value, 6) if isinstance(value, float) else value for key, value in stage.items()}
+                       for stage in self.stages],
+        }), flush=True)
+        return False
+
+
+def _labels(**labels):
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for value in labels.values())
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + '}'
+
+
+class MetricsRegistry:
+    # Totals across runs plus the last value of each stage, rendered in the Prometheus text format
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._runs = {}
+        self._run_seconds = {}
+        self._stages = {}
+
+    def record(self, pipeline, status, seconds, stages):
+        with self._lock:
+            self._runs[(pipeline, status)] = self._runs.get((pipeline, status), 0) + 1
+            total, count = self._run_seconds.get(pipeline, (0.0, 0))
+            self._run_seconds[pipeline] = (total + seconds, count + 1)
+            for stage in stages:
+                totals = self._stages.setdefault((pipeline, stage['stage']), {'seconds': 0.0, 'count': 0, 'rows': 0})
+                totals['seconds'] += stage['seconds']
+                totals['count'] += 1
+                totals['rows'] += stage['rows'] or 0
+                totals['last'] = stage
+
+    def render(self):
+        with self._lock:
+            runs = dict(self._runs)
+            run_seconds = dict(self._run_seconds)
+            stages = {key: dict(totals) for key, totals in self._stages.items()}
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f'# HELP {METRIC_PREFIX}_{name} {help_text}')
+            lines.append(f'# TYPE {METRIC_PREFIX}_{name} {kind}')
+            for suffix, labels, value in samples:
+                if value is not None:
+                    lines.append(f'{METRIC_PREFIX}_{name}{suffix}{labels} {value}')
+
+        metric('runs_total', 'counter', 'Pipeline runs by outcome.',
+               [('', _labels(pipeline=pipeline, status=status), count) for (pipeline, status), count in runs.items()])
+        metric('run_duration_seconds', 'summary', 'Wall time of whole pipeline runs.',
+               [(suffix, _labels(pipeline=pipeline), value)
+                for pipeline, (total, count) in run_seconds.items() for suffix, value in (('_sum', total), ('_count', count))])
+        metric('stage_duration_seconds', 'summary', 'Wall time spent in each pipeline stage.',
+               [(suffix, _labels(pipeline=pipeline, stage=stage), value)
+                for (pipeline, stage), totals in stages.items()
+                for suffix, value in (('_sum', totals['seconds']), ('_count', totals['count']))])
+        metric('stage_rows_total', 'counter', 'Rows processed by each pipeline stage.',
+               [('', _labels(pipeline=pipeline, stage=stage), totals['rows']) for (pipeline, stage), totals in stages.items()])
+        for name, field, help_text in (
+                ('stage_last_duration_seconds', 'seconds', 'Duration of the stage in the most recent run.'),
+                ('stage_last_rows_per_second', 'rows_per_second', 'Throughput of the stage in the most recent run.'),
+                ('stage_peak_memory_bytes', 'peak_memory_bytes', 'Peak memory at the end of the stage in the most recent run.')):
+            metric(name, 'gauge', help_text,
+                   [('', _labels(pipeline=pipeline, stage=stage), totals['last'][field]) for (pipeline, stage), totals in stages.items()])
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+def pipeline_run(pipeline):
+    # with pipeline_run('process_applications') as run: run.stage('parse'); ...; run.rows(len(df))
+    return PipelineRun(pipeline, registry) if METRICS_ENABLED else _DISABLED_RUN
@@ -0,0 +1,95 @@
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_FINISHED_JOBS = 100
+
+
+def file_identity(path):
+    stat = os.stat(path)
+    return (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+
+class JobQueue:
+    # Runs long tasks on a local thread pool and keeps their progress for polling.
+    # Submitting a key that is still queued or running returns the existing job. A finished job is only
+    # reused when reuse_finished(job) says its result is still valid: by default it is not, since its
+    # output file may since have been overwritten by a job with other export options.
+
+    def __init__(self, max_workers=1):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='cv-job')
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._jobs_by_key = {}
+
+    def submit(self, key, function, *args, reuse_finished=None, **kwargs):
+        if reuse_finished is not None:
+            # Checked outside the lock, since it may look the result up elsewhere
+            with self._lock:
+                job_id = self._jobs_by_key.get(key)
+                job = dict(self._jobs[job_id]) if job_id is not None else None
+            if job is not None and job['status'] == 'finished' and reuse_finished(job):
+                return job_id
+        with self._lock:
+            job_id = self._jobs_by_key.get(key)
+            if job_id is not None and self._jobs[job_id]['status'] in ('queued', 'running'):
+                return job_id
+            job_id = uuid.uuid4().hex
+            self._jobs[job_id] = {
+                'job_id': job_id, 'status': 'queued', 'stage': 'queued',
+                'rows_scored': 0, 'rows_total': None,
+                'submitted_at': time.time(), 'started_at': None, 'scoring_started_at': None, 'finished_at': None,
+                'result': None, 'error': None,
+            }
+            self._jobs_by_key[key] = job_id
+            self._forget_old_jobs()
+        self._executor.submit(self._run, job_id, function, args, kwargs)
+        return job_id
+
+    def _forget_old_jobs(self):
+        finished = [job for job in self._jobs.values() if job['finished_at'] is not None]
+        if len(finished) <= MAX_FINISHED_JOBS:
+            return
+        for job in sorted(finished, key=lambda job: job['finished_at'])[:len(finished) - MAX_FINISHED_JOBS]:
+            del self._jobs[job['job_id']]
+        self._jobs_by_key = {key: job_id for key, job_id in self._jobs_by_key.items() if job_id in self._jobs}
+
+    def _update(self, job_id, **changes):
+        with self._lock:
+            self._jobs[job_id].update(changes)
+
+    def _run(self, job_id, function, args, kwargs):
+        self._update(job_id, status='running', stage='starting', started_at=time.time())
+
+        def progress(stage, rows_scored=None, rows_total=None):
+            changes = {'stage': stage}
+            if rows_scored is not None:
+                changes['rows_scored'] = rows_scored
+            if rows_total is not None:
+                changes['rows_total'] = rows_total
+            with self._lock:
+                job = self._jobs[job_id]
+                if stage == 'scoring' and job['scoring_started_at'] is None:
+                    changes['scoring_started_at'] = time.time()
+                job.update(changes)
+
+        try:
+            result = function(*args, progress=progress, **kwargs)
+        except Exception as e:
+            self._update(job_id, status='failed', stage='failed', error=str(e), finished_at=time.time())
+        else:
+            self._update(job_id, status='finished', stage='done', result=result, finished_at=time.time())
+
+    def status(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            job = dict(job)
+        job['eta_seconds'] = None
+        if job['stage'] == 'scoring' and job['scoring_started_at'] and job['rows_total'] and job['rows_scored']:
+            elapsed = time.time() - job['scoring_started_at']
+            job['eta_seconds'] = round(elapsed / job['rows_scored'] * (job['rows_total'] - job['rows_scored']), 1)
+        return job
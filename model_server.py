@@ -0,0 +1,146 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import joblib
+import pandas as pd
+
+from dates import birth_date_ages
+from features import HASHED_MODEL_PATH, build_features, hashed_features
+
+VECTORIZER_PATH = 'vectorizer.pkl'
+MODEL_PATH = 'regressor_model.pkl'
+UPDATED_MODEL_PATH = 'updated_regressor_model.pkl'
+
+
+def _file_version(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+class ModelServer:
+    # Keeps the vectorizer and pipeline in memory and serves predictions from one background
+    # thread. Requests arriving within max_wait_seconds of each other share one predict() call.
+    # The hashed-feature model is served once it exists, else updated_regressor_model.pkl, else the
+    # original model. When either trained file changes, the model is reloaded and swapped in whole.
+
+    def __init__(self, vectorizer_path=VECTORIZER_PATH, model_path=MODEL_PATH, updated_model_path=UPDATED_MODEL_PATH,
+                 hashed_model_path=HASHED_MODEL_PATH, max_batch_size=512, max_wait_seconds=0.005, reload_check_seconds=1.0):
+        self.vectorizer_path = vectorizer_path
+        self.model_path = model_path
+        self.updated_model_path = updated_model_path
+        self.hashed_model_path = hashed_model_path
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self.reload_check_seconds = reload_check_seconds
+        self._requests = queue.Queue()
+        self._start_lock = threading.Lock()
+        self._thread = None
+        # (vectorizer, pipeline, versions) is replaced as one tuple, so readers never see a mix;
+        # vectorizer is None for the hashed-feature model
+        self._artifacts = None
+        self._last_reload_check = 0.0
+
+    def _versions(self):
+        return (_file_version(self.hashed_model_path), _file_version(self.updated_model_path))
+
+    def _load(self):
+        versions = self._versions()
+        if versions[0] is not None:
+            self._artifacts = (None, joblib.load(self.hashed_model_path), versions)
+            return
+        model_path = self.updated_model_path if versions[1] is not None else self.model_path
+        vectorizer = joblib.load(self.vectorizer_path)
+        pipeline = joblib.load(model_path)
+        self._artifacts = (vectorizer, pipeline, versions)
+
+    def _refresh(self):
+        now = time.monotonic()
+        if self._artifacts is not None and now - self._last_reload_check < self.reload_check_seconds:
+            return
+        self._last_reload_check = now
+        if self._artifacts is None or self._versions() != self._artifacts[2]:
+            self._load()
+
+    @property
+    def version(self):
+        # mtime of the trained model being served; None for the original model
+        artifacts = self._artifacts
+        if artifacts is None:
+            return None
+        served = next((version for version in artifacts[2] if version is not None), None)
+        return None if served is None else served[1]
+
+    def _ensure_started(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._refresh()
+                self._thread = threading.Thread(target=self._serve, name='model-server', daemon=True)
+                self._thread.start()
+
+    def _next_batch(self):
+        batch = [self._requests.get()]
+        rows = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait_seconds
+        while rows < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(request)
+            rows += len(request[0])
+        return batch
+
+    def _serve(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                self._refresh()
+                vectorizer, pipeline, _ = self._artifacts
+                candidates = pd.concat([frame for frame, _ in batch], ignore_index=True)
+                features = hashed_features(candidates) if vectorizer is None else build_features(vectorizer, candidates)
+                predictions = pipeline.predict(features)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            start = 0
+            for frame, future in batch:
+                future.set_result([float(value) for value in predictions[start:start + len(frame)]])
+                start += len(frame)
+
+    def predict(self, candidates, timeout=30):
+        # candidates: list of dicts with Skillset and either Age or Birth Date
+        frame = candidates_frame(candidates)
+        self._ensure_started()
+        future = Future()
+        self._requests.put((frame, future))
+        return future.result(timeout=timeout)
+
+
+def candidates_frame(candidates):
+    frame = pd.DataFrame.from_records(candidates)
+    if 'Skillset' not in frame:
+        raise ValueError("Every candidate needs a 'Skillset'")
+    # Age from Birth Date for every candidate that has no Age of its own
+    missing_age = frame['Age'].isna() if 'Age' in frame else pd.Series(True, index=frame.index)
+    if missing_age.any():
+        if 'Birth Date' not in frame:
+            raise ValueError("Every candidate needs an 'Age' or a 'Birth Date'")
+        # The same ages the training rows got, <NA> for a missing or unparseable date
+        ages = birth_date_ages(frame.loc[missing_age, 'Birth Date'])
+        if ages.isna().any():
+            raise ValueError("Every candidate without an 'Age' needs a 'Birth Date' that is a date")
+        frame['Age'] = frame['Age'].astype(object) if 'Age' in frame else None
+        frame.loc[missing_age, 'Age'] = ages.to_numpy(dtype=object)
+    frame['Skillset'] = frame['Skillset'].fillna('').astype(str)
+    frame['Age'] = pd.to_numeric(frame['Age'], errors='raise')
+    return frame[['Skillset', 'Age']]
@@ -0,0 +1,108 @@
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from settings import DEFAULT_OUTPUT_FORMAT, JOB_TITLE_COLUMN, OUTPUT_FORMATS
+
+_SHEET_NAME_TRANSLATION = str.maketrans({character: '_' for character in '/\\:*?[]'})
+
+
+@lru_cache(maxsize=None)
+def safe_sheet_name(job_title):
+    return job_title.translate(_SHEET_NAME_TRANSLATION)
+
+def output_path_for(output_format, base_name='sorted_candidates'):
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported output format '{output_format}', expected one of {', '.join(OUTPUT_FORMATS)}")
+    return f'{base_name}.{output_format}'
+
+def sorted_groups(df):
+    # One sort by (title, score desc) replaces a sort_values per group; lexsort is stable,
+    # so ties keep file order exactly as ingestion.sort_by_match does.
+    df = df[df[JOB_TITLE_COLUMN].notna()]
+    df = df.sort_values(by=[JOB_TITLE_COLUMN, 'Match Percentage'], ascending=[True, False], kind='mergesort')
+    titles = df[JOB_TITLE_COLUMN].to_numpy()
+    boundaries = np.flatnonzero(titles[1:] != titles[:-1]) + 1
+    starts = np.concatenate([[0], boundaries]) if len(df) else []
+    ends = np.concatenate([boundaries, [len(df)]]) if len(df) else []
+    for start, end in zip(starts, ends):
+        yield titles[start], df.iloc[start:end]
+
+def _cell_rows(group):
+    # NaN/NaT become empty cells, numpy scalars become plain Python values
+    values = group.astype(object).where(group.notna(), None)
+    return values.itertuples(index=False, name=None)
+
+def _write_xlsx(groups, output_file_path):
+    try:
+        import xlsxwriter
+    except ImportError:
+        return _write_xlsx_openpyxl(groups, output_file_path)
+    # constant_memory flushes each row as soon as the next one starts
+    workbook = xlsxwriter.Workbook(output_file_path, {
+        'constant_memory': True,
+        'strings_to_formulas': False,
+        'strings_to_urls': False,
+        'default_date_format': 'yyyy-mm-dd hh:mm:ss',
+    })
+    try:
+        for job_title, group in groups:
+            worksheet = workbook.add_worksheet(safe_sheet_name(job_title))
+            worksheet.write_row(0, 0, list(group.columns))
+            for row_number, row in enumerate(_cell_rows(group), start=1):
+                worksheet.write_row(row_number, 0, row)
+    finally:
+        workbook.close()
+
+def _write_xlsx_openpyxl(groups, output_file_path):
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    for job_title, group in groups:
+        worksheet = workbook.create_sheet(safe_sheet_name(job_title))
+        worksheet.append(list(group.columns))
+        for row in _cell_rows(group):
+            worksheet.append(row)
+    workbook.save(output_file_path)
+
+def _write_csv(groups, output_file_path):
+    header_written = False
+    with open(output_file_path, 'w', newline='', encoding='utf-8') as output_file:
+        for _, group in groups:
+            group.to_csv(output_file, header=not header_written, index=False)
+            header_written = True
+
+def _columnar_frame(groups):
+    frames = [group for _, group in groups]
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    # Arrow needs one type per column; columns mixing numbers and text are written as text
+    for column in df.columns:
+        if df[column].dtype == object and pd.api.types.infer_dtype(df[column], skipna=True).startswith('mixed'):
+            df[column] = df[column].map(lambda value: value if pd.isna(value) else str(value))
+    return df
+
+def _write_parquet(groups, output_file_path):
+    _columnar_frame(groups).to_parquet(output_file_path, index=False)
+
+def _write_feather(groups, output_file_path):
+    _columnar_frame(groups).to_feather(output_file_path)
+
+_WRITERS = {
+    'xlsx': _write_xlsx,
+    'csv': _write_csv,
+    'parquet': _write_parquet,
+    'feather': _write_feather,
+}
+
+def write_groups(groups, output_file_path, output_format=DEFAULT_OUTPUT_FORMAT):
+    # groups yields (job_title, sorted_group); xlsx gets one sheet per title, the
+    # columnar formats get a single table ordered by title and Match Percentage
+    if output_format not in _WRITERS:
+        raise ValueError(f"Unsupported output format '{output_format}', expected one of {', '.join(OUTPUT_FORMATS)}")
+    directory = os.path.dirname(output_file_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    _WRITERS[output_format](groups, output_file_path)
+    return output_file_path
@@ -0,0 +1,110 @@
+import hashlib
+import os
+import threading
+
+import pandas as pd
+
+PARSE_CACHE_DIR = os.environ.get('PARSE_CACHE_DIR', '.parse_cache')
+PARSE_CACHE_BUDGET_BYTES = int(os.environ.get('PARSE_CACHE_BUDGET_BYTES', 2 * 1024 ** 3))
+
+_digest_lock = threading.Lock()
+_digests = {}
+
+
+def _content_digest(path, size, mtime_ns):
+    # Hashing the bytes is far cheaper than parsing them; the digest is reused while size/mtime hold
+    identity = (os.path.abspath(path), size, mtime_ns)
+    with _digest_lock:
+        digest = _digests.get(identity)
+    if digest is None:
+        content_hash = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as workbook:
+            for block in iter(lambda: workbook.read(1024 * 1024), b''):
+                content_hash.update(block)
+        digest = content_hash.hexdigest()
+        with _digest_lock:
+            _digests[identity] = digest
+    return digest
+
+def content_digest(path):
+    # The workbook's bytes alone, so a copied or touched file keeps its digest
+    stat = os.stat(path)
+    return _content_digest(path, stat.st_size, stat.st_mtime_ns)
+
+def cache_key(path):
+    stat = os.stat(path)
+    digest = _content_digest(path, stat.st_size, stat.st_mtime_ns)
+    identity = f'{os.path.abspath(path)}\0{stat.st_size}\0{stat.st_mtime_ns}\0{digest}'
+    return hashlib.blake2b(identity.encode('utf-8'), digest_size=16).hexdigest()
+
+def _load(entry_path):
+    if entry_path.endswith('.arrow'):
+        import pyarrow as pa
+
+        # Uncompressed Arrow IPC, so the columns are read straight from the memory map.
+        # The map stays open for as long as the frame references its buffers.
+        return pa.ipc.open_file(pa.memory_map(entry_path)).read_all().to_pandas()
+    return pd.read_pickle(entry_path)
+
+def _write_arrow(df, entry_path):
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with pa.OSFile(entry_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+def _write_pickle(df, entry_path):
+    df.to_pickle(entry_path)
+
+def _store(df, cache_dir, key):
+    os.makedirs(cache_dir, exist_ok=True)
+    # Arrow unless pyarrow is missing or a column mixes numbers and text; the pickle keeps the exact frame
+    for extension, write in (('.arrow', _write_arrow), ('.pkl', _write_pickle)):
+        entry_path = os.path.join(cache_dir, key + extension)
+        temporary_path = f'{entry_path}.{os.getpid()}.tmp'
+        try:
+            write(df, temporary_path)
+        except (ImportError, ValueError, TypeError, NotImplementedError):
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            continue
+        os.replace(temporary_path, entry_path)
+        return entry_path
+
+def _evict(cache_dir, budget_bytes):
+    # Least recently used first; hits refresh an entry's mtime
+    entries = []
+    for entry in os.scandir(cache_dir):
+        if entry.is_file() and entry.name.endswith(('.arrow', '.pkl')):
+            stat = entry.stat()
+            entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, entry_path in sorted(entries):
+        if total <= budget_bytes:
+            break
+        try:
+            os.remove(entry_path)
+        except OSError:
+            # Already gone, or still mapped by a live frame on Windows
+            continue
+        total -= size
+
+def read_excel_cached(path, cache_dir=PARSE_CACHE_DIR, budget_bytes=PARSE_CACHE_BUDGET_BYTES):
+    # pd.read_excel(path) that skips parsing when this exact workbook was parsed before.
+    # An empty cache_dir disables the cache.
+    if not cache_dir:
+        return pd.read_excel(path)
+    key = cache_key(path)
+    for extension in ('.arrow', '.pkl'):
+        entry_path = os.path.join(cache_dir, key + extension)
+        if os.path.exists(entry_path):
+            try:
+                df = _load(entry_path)
+            except (OSError, ValueError):
+                break
+            os.utime(entry_path)
+            return df
+    df = pd.read_excel(path)
+    _store(df, cache_dir, key)
+    _evict(cache_dir, budget_bytes)
+    return df
@@ -0,0 +1,91 @@
+import os
+
+from batch import birth_date_ages_per_source, find_application_files, merge_applications, read_application_files, write_ingest_report
+from compact import compact_applications
+from compiled_requirements import compile_requirements
+from cross_job import add_best_alternative_roles
+from dates import birth_date_ages
+from ingestion import process_application_file_streaming
+from instrumentation import pipeline_run
+from output_writers import DEFAULT_OUTPUT_FORMAT, output_path_for, sorted_groups, write_groups
+from parse_cache import read_excel_cached
+from result_store import save_results
+from score_store import score_applications_incremental
+from scoring import DEFAULT_CHUNK_SIZE
+from shortlist import top_k_groups
+from skill_index import update_skill_index
+
+
+def process_applications(folder_path, job_requirements, general_requirements, workers=1, chunk_size=DEFAULT_CHUNK_SIZE, streaming=False, top_n=None, score_store_path=None, progress=None, output_format=DEFAULT_OUTPUT_FORMAT, min_score=None, skill_index_path=None, alternative_roles=False, score_matrix_path=None, batch=False, since=None, until=None, result_store_path=None, general_fallback=True):
+    # The one scoring pipeline behind app.process_applications (general_fallback=False) and
+    # data_processing.process_applications (general_fallback=True)
+    with pipeline_run('process_applications') as run:
+        progress = progress or (lambda stage, rows_scored=None, rows_total=None: None)
+        run.stage('discovery')
+        progress('discovering')
+        if streaming:
+            # The streaming path writes the output file chunk by chunk, without the whole frame these stages need
+            for enabled, option in ((batch, "Batch mode"), (skill_index_path, "The skill index"), (alternative_roles, "Alternative roles"), (result_store_path, "The result store")):
+                if enabled:
+                    raise ValueError(f"{option} cannot be combined with streaming")
+        if batch:
+            # Every export in the folder (or created between since and until), merged into one output
+            application_files = find_application_files(folder_path, "Application", since, until)
+        else:
+            latest_application_file = find_application_files(folder_path, "Application")[0]
+        if streaming:
+            run.stage('streaming')
+            return process_application_file_streaming(latest_application_file, job_requirements, general_requirements, general_fallback=general_fallback, chunk_size=chunk_size, top_n=top_n, score_store_path=score_store_path, progress=progress, output_format=output_format, min_score=min_score)
+        run.stage('parse')
+        progress('reading')
+        if batch:
+            frames, ingest_report = read_application_files(application_files, workers=workers)
+            df = merge_applications(frames, ingest_report)
+            write_ingest_report(ingest_report, output_path_for(output_format))
+        else:
+            df = read_excel_cached(latest_application_file)
+        run.rows(len(df))
+        run.stage('compact', len(df))
+        df = compact_applications(df)
+        requirements = compile_requirements(job_requirements, general_requirements)
+        if skill_index_path:
+            run.stage('skill_index', len(df))
+            for application_file, frame in (frames if batch else [(latest_application_file, df)]):
+                update_skill_index(frame, application_file, skill_index_path, requirements.tokenizer)
+
+        run.stage('score', len(df))
+        progress('scoring', 0, len(df))
+        df['Match Percentage'] = score_applications_incremental(df, requirements, general_fallback=general_fallback, store_path=score_store_path, workers=workers, chunk_size=chunk_size, progress=progress)
+        if alternative_roles:
+            run.stage('alternative_roles', len(df))
+            # Scores every candidate against every title too, for a 'Best Alternative Role' column
+            add_best_alternative_roles(df, requirements, general_fallback=general_fallback, matrix_path=score_matrix_path)
+        run.stage('age', len(df))
+        df['Age'] = birth_date_ages_per_source(df) if batch else birth_date_ages(df['Birth Date'])
+
+        if result_store_path:
+            # Every scored candidate is stored for querying; files are exported from the store on demand
+            run.stage('store', len(df))
+            progress('storing')
+            run_id = save_results(df.drop(columns=['Birth Date']), os.path.abspath(folder_path) if batch else latest_application_file, result_store_path)
+            print(f"Scored candidates saved as run {run_id} in '{result_store_path}'.")
+            return run_id
+
+        output_file_path = output_path_for(output_format)
+
+        run.stage('sort', len(df))
+        progress('writing')
+        df = df.drop(columns=['Birth Date'])
+        # With top_n only the best candidates per title are selected, without sorting whole groups
+        if top_n is not None:
+            groups = top_k_groups(df, top_n, min_score)
+        else:
+            groups = sorted_groups(df if min_score is None else df[df['Match Percentage'] >= min_score])
+        # Materialized here so sorting is timed apart from writing
+        groups = list(groups)
+        run.stage('write', sum(len(group) for _, group in groups))
+        write_groups(groups, output_file_path, output_format)
+
+        print(f"Sorted candidates file created and saved as '{output_file_path}'.")
+
+        return output_file_path
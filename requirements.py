@@ -0,0 +1,226 @@
+import json
+import os
+
+# Requirements per job title, shared by app.py and data_processing.py. Set REQUIREMENTS_FILE to a
+# JSON or YAML file with job_requirements and/or general_requirements keys to replace them.
+REQUIREMENTS_FILE = os.environ.get('REQUIREMENTS_FILE')
+
+job_requirements = {
+    'Software Developer / Engineer': {
+        'programming_languages': ['java', 'python', 'c', 'javascript'],
+        'other_skills': ['.NET', 'react', 'angular', 'databases', 'sql', 'nosql', 'version control systems', 'problem-solving skills', 'software development life cycle', 'communication', 'teamwork'],
+        'education': ['bachelor’s degree in computer science', 'related field'],
+        'experience': ['previous experience or internships in software development'],
+        'optional': ['portfolio', 'github repository', 'certifications like AWS, Microsoft']
+    },
+    'Data Scientist': {
+        'programming_languages': ['python', 'r'],
+        'other_skills': ['data analysis tools', 'machine learning frameworks', 'statistics', 'data preprocessing', 'data visualization', 'SQL'],
+        'education': ['bachelor’s or master’s degree in data science', 'computer science', 'statistics', 'related field'],
+        'experience': ['experience in handling large datasets'],
+        'optional': ['project experience', 'analytical skills']
+    },
+    'Project Manager': {
+        'programming_languages': [],
+        'other_skills': ['project management tools', 'risk management', 'budgeting', 'scheduling', 'communication', 'leadership', 'problem-solving', 'agile/scrum methodologies'],
+        'education': ['bachelor’s degree in business administration', 'management', 'related field'],
+        'experience': ['experience in project management'],
+        'optional': ['PMP certification', 'track record of delivering projects on time and within budget']
+    },
+    'UI/UX Designer': {
+        'programming_languages': [],
+        'other_skills': ['adobe xd', 'sketch', 'figma', 'user-centered design principles', 'wireframes', 'prototypes', 'communication'],
+        'education': ['bachelor’s degree in design', 'fine arts', 'related field'],
+        'experience': ['experience in UI/UX design'],
+        'optional': ['knowledge of HTML/CSS', 'portfolio']
+    },
+    'DevOps Engineer': {
+        'programming_languages': ['python', 'ruby', 'go', 'bash'],
+        'other_skills': ['aws', 'azure', 'google cloud', 'docker', 'kubernetes', 'ci/cd pipelines', 'terraform', 'ansible', 'prometheus', 'grafana'],
+        'education': ['bachelor’s degree in computer science', 'engineering', 'related field'],
+        'experience': ['experience in software development and system operations'],
+        'optional': ['AWS Certified DevOps Engineer', 'problem-solving skills']
+    },
+    'Marketing Specialist': {
+        'programming_languages': [],
+        'other_skills': ['google analytics', 'seo tools', 'social media platforms', 'content creation', 'communication', 'writing', 'analytical skills'],
+        'education': ['bachelor’s degree in marketing', 'communications', 'related field'],
+        'experience': ['previous experience or internships in marketing'],
+        'optional': ['portfolio of marketing campaigns', 'knowledge of marketing trends and best practices']
+    },
+    'Human Resources Manager': {
+        'programming_languages': [],
+        'other_skills': ['interpersonal skills', 'communication', 'hr software', 'workday', 'adp', 'labor laws', 'recruitment', 'onboarding', 'conflict resolution', 'organizational skills'],
+        'education': ['bachelor’s degree in human resources', 'business administration', 'related field'],
+        'experience': ['previous HR experience'],
+        'optional': ['SHRM-CP', 'PHR certifications', 'track record in managing HR functions']
+    },
+    'Financial Analyst': {
+        'programming_languages': [],
+        'other_skills': ['financial modeling', 'forecasting', 'analytical skills', 'quantitative skills', 'financial software', 'excel', 'quickbooks', 'accounting principles'],
+        'education': ['bachelor’s degree in finance', 'accounting', 'related field'],
+        'experience': ['previous experience or internships in finance'],
+        'optional': ['CFA certification', 'attention to detail']
+    },
+    'Customer Support Specialist': {
+        'programming_languages': [],
+        'other_skills': ['communication', 'interpersonal skills', 'problem-solving', 'customer support software', 'zendesk', 'salesforce', 'patience', 'empathy', 'high-stress situations'],
+        'education': ['high school diploma or equivalent; bachelor’s degree preferred'],
+        'experience': ['previous experience in customer service or support'],
+        'optional': ['multilingual abilities', 'track record of resolving customer issues']
+    },
+    'Cybersecurity Analyst': {
+        'programming_languages': [],
+        'other_skills': ['security tools', 'firewalls', 'IDS/IPS', 'network security', 'protocols', 'regulatory standards', 'GDPR', 'HIPAA', 'vulnerability assessments', 'penetration testing'],
+        'education': ['bachelor’s degree in cybersecurity', 'computer science', 'related field'],
+        'experience': ['previous experience in cybersecurity roles'],
+        'optional': ['CISSP', 'CEH certifications', 'attention to detail', 'investigative skills']
+    },
+    'Field Technician': {
+        'programming_languages': [],
+        'other_skills': ['mechanical aptitude', 'problem-solving skills', 'communication', 'teamwork'],
+        'education': ['high school diploma or equivalent', 'technical certification'],
+        'experience': ['previous experience in field work or related technical role'],
+        'optional': ['certifications in relevant field']
+    },
+    'Project Engineer': {
+        'programming_languages': [],
+        'other_skills': ['project management', 'engineering principles', 'communication', 'teamwork', 'problem-solving skills'],
+        'education': ['bachelor’s degree in engineering', 'related field'],
+        'experience': ['experience in project management or engineering projects'],
+        'optional': ['PMP certification', 'relevant engineering certifications']
+    },
+    'Senior Project Manager': {
+        'programming_languages': [],
+        'other_skills': ['advanced project management', 'leadership', 'risk management', 'budgeting', 'communication', 'teamwork'],
+        'education': ['bachelor’s degree in engineering', 'project management', 'related field'],
+        'experience': ['extensive experience in project management'],
+        'optional': ['PMP certification', 'track record of successful project delivery']
+    },
+    'Chief Operations Officer (COO)': {
+        'programming_languages': [],
+        'other_skills': ['executive leadership', 'strategic planning', 'financial acumen', 'communication', 'teamwork', 'problem-solving skills'],
+        'education': ['bachelor’s degree in business administration', 'engineering', 'related field'],
+        'experience': ['significant executive experience in operations management'],
+        'optional': ['MBA', 'track record of improving operational efficiency']
+    },
+    'Operator': {
+        'programming_languages': [],
+        'other_skills': ['mechanical aptitude', 'equipment operation', 'communication', 'teamwork'],
+        'education': ['high school diploma or equivalent'],
+        'experience': ['previous experience as an operator or in a similar role'],
+        'optional': ['certifications in equipment operation']
+    },
+    'Electrical Engineer': {
+        'programming_languages': [],
+        'other_skills': ['electrical engineering principles', 'problem-solving skills', 'communication', 'teamwork'],
+        'education': ['bachelor’s degree in electrical engineering', 'related field'],
+        'experience': ['experience in electrical engineering'],
+        'optional': ['PE license', 'relevant certifications']
+    },
+    'Mechanical Engineer': {
+        'programming_languages': [],
+        'other_skills': ['mechanical engineering principles', 'problem-solving skills', 'communication', 'teamwork'],
+        'education': ['bachelor’s degree in mechanical engineering', 'related field'],
+        'experience': ['experience in mechanical engineering'],
+        'optional': ['PE license', 'relevant certifications']
+    },
+    'Drilling Supervisor': {
+        'programming_languages': [],
+        'other_skills': ['drilling operations', 'leadership', 'problem-solving skills', 'communication', 'teamwork'],
+        'education': ['bachelor’s degree in engineering', 'related field'],
+        'experience': ['experience in drilling operations'],
+        'optional': ['relevant certifications', 'track record of successful drilling projects']
+    },
+    'Senior Electrical Engineer': {
+        'programming_languages': [],
+        'other_skills': ['advanced electrical engineering principles', 'leadership', 'problem-solving skills', 'communication', 'teamwork'],
+        'education': ['bachelor’s degree in electrical engineering', 'related field'],
+        'experience': ['extensive experience in electrical engineering'],
+        'optional': ['PE license', 'relevant certifications']
+    },
+    'Chief Executive Officer (CEO)': {
+        'programming_languages': [],
+        'other_skills': ['executive leadership', 'strategic planning', 'financial acumen', 'communication', 'teamwork', 'problem-solving skills'],
+        'education': ['bachelor’s degree in business administration', 'engineering', 'related field'],
+        'experience': ['significant executive experience in operations management'],
+        'optional': ['MBA', 'track record of successful company leadership']
+    },
+    'Site Assistant': {
+        'programming_languages': [],
+        'other_skills': ['site management', 'communication', 'teamwork', 'problem-solving skills'],
+        'education': ['high school diploma or equivalent'],
+        'experience': ['previous experience in site management or related field'],
+        'optional': ['certifications in site management']
+    },
+    'Site Engineer': {
+        'programming_languages': [],
+        'other_skills': ['site management', 'engineering principles', 'communication', 'teamwork', 'problem-solving skills'],
+        'education': ['bachelor’s degree in engineering', 'related field'],
+        'experience': ['experience in site engineering'],
+        'optional': ['PE license', 'relevant certifications']
+    },
+    'Senior Site Engineer': {
+        'programming_languages': [],
+        'other_skills': ['advanced site management', 'engineering principles', 'leadership', 'communication', 'teamwork', 'problem-solving skills'],
+        'education': ['bachelor’s degree in engineering', 'related field'],
+        'experience': ['extensive experience in site engineering'],
+        'optional': ['PE license', 'relevant certifications']
+    },
+    'Chief Engineering Officer': {
+        'programming_languages': [],
+        'other_skills': ['executive leadership', 'strategic planning', 'financial acumen', 'communication', 'teamwork', 'problem-solving skills'],
+        'education': ['bachelor’s degree in engineering', 'related field'],
+        'experience': ['significant executive experience in engineering management'],
+        'optional': ['MBA', 'track record of successful engineering projects']
+    },
+    'Sales Associate': {
+        'programming_languages': [],
+        'other_skills': ['customer service', 'sales techniques', 'communication', 'interpersonal skills', 'product knowledge'],
+        'education': ['high school diploma or equivalent'],
+        'experience': ['previous retail or sales experience'],
+        'optional': ['multilingual abilities', 'track record of achieving sales targets']
+    },
+    'Store Manager': {
+        'programming_languages': [],
+        'other_skills': ['retail management', 'leadership', 'inventory management', 'budgeting', 'customer service', 'communication'],
+        'education': ['bachelor’s degree in business administration', 'related field'],
+        'experience': ['experience in retail management'],
+        'optional': ['track record of improving store performance']
+    },
+    'Regional Manager': {
+        'programming_languages': [],
+        'other_skills': ['multi-store management', 'leadership', 'strategic planning', 'budgeting', 'communication', 'teamwork'],
+        'education': ['bachelor’s degree in business administration', 'related field'],
+        'experience': ['significant experience in retail management'],
+        'optional': ['track record of managing multiple locations']
+    },
+    'Director of Retail Operations': {
+        'programming_languages': [],
+        'other_skills': ['executive leadership', 'strategic planning', 'financial acumen', 'communication', 'teamwork', 'problem-solving skills'],
+        'education': ['bachelor’s degree in business administration', 'related field'],
+        'experience': ['extensive experience in retail management'],
+        'optional': ['MBA', 'track record of successful retail operations management']
+    }
+}
+
+general_requirements = {
+    'programming_languages': [],
+    'other_skills': ['communication', 'problem-solving', 'teamwork', 'adaptability', 'time management'],
+    'education': ['bachelor’s degree in any field'],
+    'experience': ['previous relevant experience'],
+    'optional': []
+}
+
+def load_requirements(path):
+    with open(path, encoding='utf-8') as requirements_file:
+        if path.lower().endswith(('.yaml', '.yml')):
+            import yaml
+
+            return yaml.safe_load(requirements_file)
+        return json.load(requirements_file)
+
+if REQUIREMENTS_FILE:
+    _loaded = load_requirements(REQUIREMENTS_FILE)
+    job_requirements = _loaded.get('job_requirements', job_requirements)
+    general_requirements = _loaded.get('general_requirements', general_requirements)
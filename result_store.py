@@ -0,0 +1,252 @@
+import base64
+import datetime
+import glob
+import json
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+
+from compact import compact_ages
+from hiring_store import quote_identifier, sql_value
+from output_writers import DEFAULT_OUTPUT_FORMAT, sorted_groups, write_groups
+from settings import JOB_TITLE_COLUMN, RESULT_EXPORT_DIR, RESULT_STORE_PATH
+from shortlist import top_k_groups
+
+ROW_ID_COLUMN = '_row_id'
+RUN_COLUMN = '_run'
+SCORE_COLUMN = 'Match Percentage'
+AGE_COLUMN = 'Age'
+# Runs older than the newest RESULT_STORE_KEEP_RUNS are deleted when a new one is saved
+RESULT_STORE_KEEP_RUNS = int(os.environ.get('RESULT_STORE_KEEP_RUNS', 5))
+# Exported files of a run start with this; they are deleted together with the run
+EXPORT_PREFIX = 'sorted_candidates_run{run_id}_'
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+# Sort expressions never evaluate to NULL, so a keyset condition is a plain range comparison SQLite can
+# seek on; missing ages sort as -1 and missing titles as ''. The indexes below are built on the same expressions.
+TITLE_KEY = f"COALESCE({quote_identifier(JOB_TITLE_COLUMN)}, '')"
+SCORE_KEY = f'COALESCE({quote_identifier(SCORE_COLUMN)}, -1)'
+AGE_KEY = f'COALESCE({quote_identifier(AGE_COLUMN)}, -1)'
+# Sort name -> (expression, descending) keys in their natural direction; the row ID breaks remaining ties.
+# job_title pages through the candidates in the order of the sorted workbook.
+SORT_KEYS = {
+    'match_percentage': [(SCORE_KEY, True)],
+    'age': [(AGE_KEY, True)],
+    'job_title': [(TITLE_KEY, False), (SCORE_KEY, True)],
+}
+
+def _column_values(values):
+    # One column as Python values sqlite3 can bind, converted in bulk rather than per cell
+    if pd.api.types.is_datetime64_any_dtype(values.dtype):
+        text = values.dt.strftime('%Y-%m-%dT%H:%M:%S')
+        return text.to_numpy(dtype=object, na_value=None).tolist()
+    values = values.to_numpy(dtype=object, na_value=None).tolist()
+    if any(value is not None and not isinstance(value, (str, int, float)) for value in values):
+        values = [sql_value(value) for value in values]
+    return values
+
+def encode_cursor(key_values):
+    return base64.urlsafe_b64encode(json.dumps(list(key_values)).encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor, key_count):
+    try:
+        key_values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (ValueError, TypeError, UnicodeError):
+        key_values = None
+    if not isinstance(key_values, list) or len(key_values) != key_count:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return key_values
+
+def keyset_condition(keys, key_values):
+    # Rows after key_values in the order of keys: (k1 after v1) OR (k1 = v1 AND k2 after v2) OR ...,
+    # plus a bound on the first key alone, which is what lets SQLite seek instead of scanning from the start
+    first_key, first_descending = keys[0]
+    clauses = [f"{first_key} {'<=' if first_descending else '>='} ?"]
+    params = [key_values[0]]
+    alternatives = []
+    for position, (key, descending) in enumerate(keys):
+        equal = [f'{previous} = ?' for previous, _ in keys[:position]]
+        alternatives.append('(' + ' AND '.join(equal + [f"{key} {'<' if descending else '>'} ?"]) + ')')
+        params.extend(key_values[:position + 1])
+    clauses.append('(' + ' OR '.join(alternatives) + ')')
+    return ' AND '.join(clauses), params
+
+def export_base_name(run_id, created_at, top_n=None, min_score=None):
+    # Runs never change, so an export is reused; the creation time keeps a recreated store from serving old files
+    created_at = created_at.replace(':', '').replace('-', '')
+    return EXPORT_PREFIX.format(run_id=run_id) + created_at + (f"_top{top_n}" if top_n else '') + (f"_min{min_score:g}" if min_score is not None else '')
+
+
+class ResultStore:
+    # Scored candidates of the latest runs, one SQLite row per candidate, so slices can be queried
+    # without building a workbook. Job title, Match Percentage and Age are indexed together with
+    # the run; the other workbook columns are stored under their own names and added with ALTER TABLE
+    # when first seen. Rows keep the order they were scored in through their row ID.
+    # Files exported from a run into export_dir are deleted when the run is.
+
+    def __init__(self, path=RESULT_STORE_PATH, timeout=30, export_dir=RESULT_EXPORT_DIR):
+        self.export_dir = export_dir
+        self.connection = sqlite3.connect(path, timeout=timeout, isolation_level=None, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        title, score, age = (quote_identifier(column) for column in (JOB_TITLE_COLUMN, SCORE_COLUMN, AGE_COLUMN))
+        # Without AUTOINCREMENT a new row still gets the highest row ID + 1; only the oldest runs are
+        # ever deleted, so row IDs keep following the order rows were saved in
+        self.connection.execute(
+            f'CREATE TABLE IF NOT EXISTS candidates ({ROW_ID_COLUMN} INTEGER PRIMARY KEY, '
+            f'{RUN_COLUMN} INTEGER NOT NULL, {title} TEXT, {score} REAL, {age} INTEGER)')
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS runs (run_id INTEGER PRIMARY KEY AUTOINCREMENT, '
+            'source TEXT, columns TEXT NOT NULL, rows INTEGER NOT NULL, created_at TEXT NOT NULL)')
+        # In the natural direction of each sort with the row ID ascending; reversed sorts walk them backwards
+        self.connection.execute(f'CREATE INDEX IF NOT EXISTS candidates_title_score ON candidates ({RUN_COLUMN}, {TITLE_KEY}, {SCORE_KEY} DESC, {ROW_ID_COLUMN})')
+        self.connection.execute(f'CREATE INDEX IF NOT EXISTS candidates_score ON candidates ({RUN_COLUMN}, {SCORE_KEY} DESC, {ROW_ID_COLUMN})')
+        self.connection.execute(f'CREATE INDEX IF NOT EXISTS candidates_age ON candidates ({RUN_COLUMN}, {AGE_KEY} DESC, {ROW_ID_COLUMN})')
+        # ANALYZE after each save samples this many index entries, enough to choose between the indexes
+        self.connection.execute('PRAGMA analysis_limit=1000')
+        self._lock = threading.Lock()
+
+    def columns(self):
+        return [row[1] for row in self.connection.execute('PRAGMA table_info(candidates)')]
+
+    def save(self, df, source=None, keep_runs=RESULT_STORE_KEEP_RUNS):
+        # Stores one scored run in a single transaction and returns its run ID
+        columns = [str(column) for column in df.columns]
+        with self._lock:
+            self.connection.execute('BEGIN IMMEDIATE')
+            try:
+                existing = set(self.columns())
+                for column in columns:
+                    if column not in existing:
+                        self.connection.execute(f'ALTER TABLE candidates ADD COLUMN {quote_identifier(column)}')
+                run_id = self.connection.execute(
+                    'INSERT INTO runs (source, columns, rows, created_at) VALUES (?, ?, ?, ?)',
+                    (source, json.dumps(columns), len(df), datetime.datetime.now().isoformat(timespec='seconds'))).lastrowid
+                column_list = ', '.join([RUN_COLUMN] + [quote_identifier(column) for column in columns])
+                placeholders = ', '.join(['?'] * (len(columns) + 1))
+                values = [_column_values(df[column]) for column in df.columns]
+                self.connection.executemany(
+                    f'INSERT INTO candidates ({column_list}) VALUES ({placeholders})',
+                    zip([run_id] * len(df), *values))
+                stale = [row[0] for row in self.connection.execute(
+                    'SELECT run_id FROM runs ORDER BY run_id DESC LIMIT -1 OFFSET ?', (max(keep_runs, 1),))]
+                for stale_run in stale:
+                    self.connection.execute(f'DELETE FROM candidates WHERE {RUN_COLUMN} = ?', (stale_run,))
+                    self.connection.execute('DELETE FROM runs WHERE run_id = ?', (stale_run,))
+                self.connection.execute('COMMIT')
+            except BaseException:
+                self.connection.execute('ROLLBACK')
+                raise
+            self._remove_exports(stale)
+            # Statistics let the planner pick, say, the score index for "ages 30-35 by score" instead of sorting every such row
+            self.connection.execute('ANALYZE')
+        return run_id
+
+    def _remove_exports(self, run_ids):
+        if not self.export_dir:
+            return
+        for run_id in run_ids:
+            for export_path in glob.glob(os.path.join(glob.escape(self.export_dir), EXPORT_PREFIX.format(run_id=run_id) + '*')):
+                try:
+                    os.remove(export_path)
+                except FileNotFoundError:
+                    pass
+
+    def runs(self):
+        rows = self.connection.execute('SELECT run_id, source, rows, created_at FROM runs ORDER BY run_id DESC').fetchall()
+        return [dict(zip(('run_id', 'source', 'rows', 'created_at'), row)) for row in rows]
+
+    def run(self, run_id):
+        row = self.connection.execute('SELECT run_id, source, rows, created_at FROM runs WHERE run_id = ?', (run_id,)).fetchone()
+        return None if row is None else dict(zip(('run_id', 'source', 'rows', 'created_at'), row))
+
+    def latest_run(self):
+        row = self.connection.execute('SELECT MAX(run_id) FROM runs').fetchone()
+        return row[0]
+
+    def run_columns(self, run_id):
+        row = self.connection.execute('SELECT columns FROM runs WHERE run_id = ?', (run_id,)).fetchone()
+        if row is None:
+            raise KeyError(f"Unknown run: {run_id}")
+        return json.loads(row[0])
+
+    def query(self, run_id=None, titles=None, min_score=None, max_score=None, min_age=None, max_age=None,
+              sort='match_percentage', descending=None, limit=DEFAULT_PAGE_SIZE, cursor=None):
+        # One page of candidates and the cursor of the next page (None on the last page).
+        # Keyset pagination: the cursor holds the last row's sort keys, so every page is an index range
+        # scan however deep it is. descending=None sorts in the natural direction of the sort
+        # (best scores, oldest candidates and titles A-Z first); ties follow the row order.
+        run_id = self.latest_run() if run_id is None else run_id
+        columns = self.run_columns(run_id)
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Unsupported sort '{sort}', expected one of {', '.join(SORT_KEYS)}")
+        limit = min(max(int(limit), 1), MAX_PAGE_SIZE)
+        keys = SORT_KEYS[sort] + [(ROW_ID_COLUMN, False)]
+        if descending is not None and descending != keys[0][1]:
+            keys = [(key, not key_descending) for key, key_descending in keys]
+        conditions = [f'{RUN_COLUMN} = ?']
+        params = [run_id]
+        if titles:
+            conditions.append(f"{TITLE_KEY} IN ({', '.join(['?'] * len(titles))})")
+            params.extend(titles)
+        for key, operator, value in ((SCORE_KEY, '>=', min_score), (SCORE_KEY, '<=', max_score),
+                                     (quote_identifier(AGE_COLUMN), '>=', min_age), (quote_identifier(AGE_COLUMN), '<=', max_age)):
+            if value is not None:
+                conditions.append(f'{key} {operator} ?')
+                params.append(value)
+        if cursor is not None:
+            condition, condition_params = keyset_condition(keys, decode_cursor(cursor, len(keys)))
+            conditions.append(condition)
+            params.extend(condition_params)
+        order = ', '.join(f"{key} {'DESC' if key_descending else 'ASC'}" for key, key_descending in keys)
+        selected = ', '.join([key for key, _ in keys] + [quote_identifier(column) for column in columns])
+        rows = self.connection.execute(
+            f"SELECT {selected} FROM candidates WHERE {' AND '.join(conditions)} ORDER BY {order} LIMIT ?",
+            params + [limit + 1]).fetchall()
+        next_cursor = encode_cursor(rows[limit - 1][:len(keys)]) if len(rows) > limit else None
+        return [dict(zip(columns, row[len(keys):])) for row in rows[:limit]], next_cursor
+
+    def frame(self, run_id):
+        # The whole run in scoring order, with the column order it was saved with
+        columns = self.run_columns(run_id)
+        df = pd.read_sql_query(
+            f"SELECT {', '.join(quote_identifier(column) for column in columns)} FROM candidates "
+            f'WHERE {RUN_COLUMN} = ? ORDER BY {ROW_ID_COLUMN}',
+            self.connection, params=(run_id,))
+        if AGE_COLUMN in df.columns:
+            df[AGE_COLUMN] = compact_ages(df[AGE_COLUMN])
+        return df
+
+    def close(self):
+        self.connection.close()
+
+
+def save_results(df, source=None, path=RESULT_STORE_PATH):
+    store = ResultStore(path)
+    try:
+        return store.save(df, source)
+    finally:
+        store.close()
+
+def export_results(run_id, output_file_path, output_format=DEFAULT_OUTPUT_FORMAT, top_n=None, min_score=None, path=RESULT_STORE_PATH):
+    # Writes a stored run like process_applications would have, only when a file is asked for.
+    # The file is written under a temporary name first, so a concurrent request never sends half of it.
+    store = ResultStore(path)
+    try:
+        df = store.frame(run_id)
+    finally:
+        store.close()
+    if top_n is not None:
+        groups = top_k_groups(df, top_n, min_score)
+    else:
+        groups = sorted_groups(df if min_score is None else df[df[SCORE_COLUMN] >= min_score])
+    temporary_path = f'{output_file_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        write_groups(groups, temporary_path, output_format)
+        os.replace(temporary_path, output_file_path)
+    finally:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+    return output_file_path
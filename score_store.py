@@ -0,0 +1,75 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from compiled_requirements import compile_requirements
+from scoring import DEFAULT_CHUNK_SIZE, SCORING_COLUMNS, score_applications_parallel
+from settings import SCORE_STORE_PATH
+
+
+def row_fingerprints(df):
+    # Hash of exactly what the scorer reads; values are compared as text because the scorer uses str()
+    return pd.util.hash_pandas_object(df[SCORING_COLUMNS].astype(str), index=False).to_numpy().view(np.int64)
+
+
+class ScoreStore:
+    # Match Percentage per row fingerprint, valid for a single requirements key.
+    # Opening the store with a different key discards every stored score.
+
+    def __init__(self, path, requirements_key):
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+        self.connection.execute('CREATE TABLE IF NOT EXISTS scores (row_hash INTEGER PRIMARY KEY, score REAL NOT NULL)')
+        stored_key = self.connection.execute("SELECT value FROM meta WHERE key = 'requirements'").fetchone()
+        if stored_key is None or stored_key[0] != requirements_key:
+            with self.connection:
+                self.connection.execute('DELETE FROM scores')
+                self.connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('requirements', ?)", (requirements_key,))
+
+    def lookup(self, row_hashes):
+        with self.connection:
+            self.connection.execute('CREATE TEMP TABLE IF NOT EXISTS wanted (row_hash INTEGER PRIMARY KEY)')
+            self.connection.execute('DELETE FROM wanted')
+            self.connection.executemany('INSERT OR IGNORE INTO wanted (row_hash) VALUES (?)', ((int(h),) for h in row_hashes))
+            rows = self.connection.execute('SELECT scores.row_hash, scores.score FROM scores JOIN wanted USING (row_hash)').fetchall()
+        return dict(rows)
+
+    def save(self, row_hashes, scores):
+        with self.connection:
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO scores (row_hash, score) VALUES (?, ?)',
+                zip(map(int, row_hashes), map(float, scores)))
+
+    def close(self):
+        self.connection.close()
+
+
+def score_applications_incremental(df, job_requirements, general_requirements=None, general_fallback=True,
+                                   store_path=SCORE_STORE_PATH, workers=1, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    # Scores only rows the store has not seen under the current requirements, then merges.
+    # Without a store_path every row is scored.
+    requirements = compile_requirements(job_requirements, general_requirements)
+    if store_path is None:
+        return score_applications_parallel(df, requirements, general_fallback=general_fallback, workers=workers, chunk_size=chunk_size, progress=progress)
+    store = ScoreStore(store_path, f'{requirements.fingerprint}:{int(general_fallback)}')
+    try:
+        row_hashes = row_fingerprints(df)
+        known = store.lookup(np.unique(row_hashes))
+        scores = np.array([known.get(row_hash, np.nan) for row_hash in row_hashes.tolist()], dtype=np.float64)
+        missing = np.isnan(scores)
+        if missing.any():
+            already_scored = int((~missing).sum())
+            chunk_progress = None
+            if progress is not None:
+                chunk_progress = lambda stage, rows_scored, rows_total: progress(stage, already_scored + rows_scored, len(df))
+            new_scores = score_applications_parallel(
+                df[missing], requirements, general_fallback=general_fallback,
+                workers=workers, chunk_size=chunk_size, progress=chunk_progress).to_numpy()
+            scores[missing] = new_scores
+            store.save(row_hashes[missing], new_scores)
+        elif progress is not None:
+            progress('scoring', len(df), len(df))
+    finally:
+        store.close()
+    return pd.Series(scores, index=df.index, name='Match Percentage')
@@ -0,0 +1,111 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from compiled_requirements import compile_requirements
+from fuzzy_matching import match_column
+from settings import DEFAULT_CHUNK_SIZE, JOB_TITLE_COLUMN
+
+SCORING_COLUMNS = [JOB_TITLE_COLUMN, 'Skillset', 'Education', 'Years of Experience']
+PARALLEL_MIN_ROWS = 50000
+
+
+def _encode_distinct_skillsets(skillsets, vocabulary, tokenizer):
+    # Canonical skills per distinct Skillset, keeping only those some job asks for
+    rows = []
+    cols = []
+    for row, skillset in enumerate(skillsets):
+        for skill in tokenizer.tokenize(skillset):
+            skill_id = vocabulary.get(skill)
+            if skill_id is not None:
+                rows.append(row)
+                cols.append(skill_id)
+    # tokenize() drops repeats, so a candidate listing the same skill twice still counts it once, as with set()
+    data = np.ones(len(rows), dtype=np.float64)
+    return sparse.csr_matrix((data, (rows, cols)), shape=(len(skillsets), len(vocabulary)))
+
+def encode_skillsets(skillsets, requirements):
+    # Each distinct Skillset is tokenized once and rows take their matrix row by code;
+    # for a categorical column the codes are already there. Missing values get an empty last row.
+    codes, uniques = pd.factorize(skillsets)
+    distinct = _encode_distinct_skillsets(np.asarray(uniques, dtype=object), requirements.vocabulary, requirements.tokenizer)
+    empty_row = sparse.csr_matrix((1, distinct.shape[1]), dtype=np.float64)
+    return sparse.vstack([distinct, empty_row], format='csr')[np.where(codes < 0, len(uniques), codes)]
+
+def skill_match_percentage(candidate_matrix, requirement_matrix, required_counts, title_positions=None):
+    # One sparse product gives every candidate's overlap with every title. cross_job.score_matrix takes
+    # all of it (candidates x titles); with title_positions, score_applications takes each candidate's own title.
+    match_counts = candidate_matrix @ requirement_matrix
+    if title_positions is None:
+        match_counts, required = match_counts.toarray(), required_counts
+    else:
+        match_counts, required = np.asarray(match_counts[np.arange(len(title_positions)), title_positions]).ravel(), required_counts[title_positions]
+    # Titles without required skills stay at 0
+    skill_match_percentage = np.divide(match_counts, required, out=np.zeros(match_counts.shape, dtype=np.float64), where=required > 0) * 100
+    # evaluate_* pass zero years of experience, so the experience half is always 0.0
+    return (skill_match_percentage + 0.0) / 2
+
+def title_positions(job_titles, requirements):
+    # Titles missing from job_requirements are scored against general_requirements (last position)
+    codes, uniques = pd.factorize(job_titles, use_na_sentinel=False)
+    positions = np.fromiter((requirements.position(title) for title in uniques), dtype=np.int64, count=len(uniques))
+    return positions[codes]
+
+def score_applications(df, job_requirements, general_requirements=None, general_fallback=True):
+    requirements = compile_requirements(job_requirements, general_requirements)
+    positions = title_positions(df[JOB_TITLE_COLUMN], requirements)
+
+    candidate_matrix = encode_skillsets(df['Skillset'], requirements)
+    programming_languages_match = skill_match_percentage(
+        candidate_matrix, *requirements.requirement_matrix('programming_languages', general_fallback), positions)
+    other_skills_match = skill_match_percentage(
+        candidate_matrix, *requirements.requirement_matrix('other_skills', general_fallback), positions)
+
+    education_match = match_column(df['Education'], positions, [profile.education for profile in requirements.profiles])
+    experience_match = match_column(df['Years of Experience'], positions, [profile.experience for profile in requirements.profiles])
+
+    overall_match = (programming_languages_match + other_skills_match + education_match + experience_match) / 4
+    return pd.Series(overall_match, index=df.index, name='Match Percentage')
+
+_worker_requirements = None
+
+def _init_worker(requirements):
+    # Each worker receives the compiled requirements once, not with every chunk
+    global _worker_requirements
+    _worker_requirements = requirements
+
+def _score_chunk(chunk, general_fallback):
+    return score_applications(chunk, _worker_requirements, general_fallback=general_fallback).to_numpy()
+
+def _report(progress, rows_scored, rows_total):
+    if progress is not None:
+        progress('scoring', rows_scored, rows_total)
+
+def score_applications_parallel(df, job_requirements, general_requirements=None, general_fallback=True,
+                                workers=None, chunk_size=DEFAULT_CHUNK_SIZE, min_rows=PARALLEL_MIN_ROWS, progress=None):
+    # progress, when given, is called as progress('scoring', rows_scored, rows_total) after each chunk
+    requirements = compile_requirements(job_requirements, general_requirements)
+    workers = workers or os.cpu_count() or 1
+    chunk_size = max(int(chunk_size), 1)
+    scoring_frame = df[SCORING_COLUMNS]
+    chunks = [scoring_frame.iloc[start:start + chunk_size] for start in range(0, len(df), chunk_size)]
+    scores = []
+    if workers <= 1 or len(df) < max(min_rows, chunk_size + 1):
+        if progress is None:
+            return score_applications(df, requirements, general_fallback=general_fallback)
+        for chunk in chunks:
+            scores.append(score_applications(chunk, requirements, general_fallback=general_fallback).to_numpy())
+            _report(progress, sum(map(len, scores)), len(df))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), initializer=_init_worker, initargs=(requirements,)) as executor:
+            # map() yields results in submission order, so rows come back in their original order
+            for chunk_scores in executor.map(_score_chunk, chunks, repeat(general_fallback)):
+                scores.append(chunk_scores)
+                _report(progress, sum(map(len, scores)), len(df))
+    if not scores:
+        return score_applications(df, requirements, general_fallback=general_fallback)
+    return pd.Series(np.concatenate(scores), index=df.index, name='Match Percentage')
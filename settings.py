@@ -0,0 +1,16 @@
+import os
+
+# Defaults shared by the pipeline modules and app.py. This module must stay free of heavy
+# imports: app.py reads it at startup, before pandas, scipy or sklearn are loaded.
+JOB_TITLE_COLUMN = 'Job Title You Are Applying For \'If Not Write in Other\''
+DEFAULT_CHUNK_SIZE = 25000
+OUTPUT_FORMATS = ('xlsx', 'csv', 'parquet', 'feather')
+DEFAULT_OUTPUT_FORMAT = 'xlsx'
+SCORE_STORE_PATH = 'candidate_scores.sqlite3'
+SKILL_INDEX_PATH = 'skill_index.npz'
+SCORE_MATRIX_PATH = 'score_matrix.npz'
+HIRING_STORE_PATH = 'hiring_data.sqlite3'
+# update_model also trains the hashed-feature model, which ModelServer serves once it exists
+USE_HASHED_FEATURES = True
+RESULT_STORE_PATH = os.environ.get('RESULT_STORE_PATH', 'candidate_results.sqlite3')
+RESULT_EXPORT_DIR = os.environ.get('RESULT_EXPORT_DIR', 'exports')
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from scoring import JOB_TITLE_COLUMN
+
+
+def top_k_positions(scores, k):
+    # Positions of the k highest scores, best first. Ties are broken by position, so the result
+    # equals the head of a stable descending sort, but only the k winners are ever sorted.
+    scores = np.nan_to_num(np.asarray(scores, dtype=np.float64), nan=-np.inf)
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    if len(scores) > k:
+        threshold = np.partition(scores, len(scores) - k)[len(scores) - k]
+        above = np.flatnonzero(scores > threshold)
+        tied = np.flatnonzero(scores == threshold)[:k - len(above)]
+        candidates = np.concatenate([above, tied])
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.lexsort((candidates, -scores[candidates]))]
+
+def select_top(df, k, min_score=None):
+    if min_score is not None:
+        df = df[df['Match Percentage'] >= min_score]
+    return df.iloc[top_k_positions(df['Match Percentage'].to_numpy(), k)]
+
+def top_k_groups(df, k, min_score=None):
+    # (job_title, top k candidates) per title in title order, like output_writers.sorted_groups
+    if min_score is not None:
+        df = df[df['Match Percentage'] >= min_score]
+    df = df[df[JOB_TITLE_COLUMN].notna()]
+    codes, titles = pd.factorize(df[JOB_TITLE_COLUMN], sort=True)
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(len(titles) + 1))
+    scores = df['Match Percentage'].to_numpy(dtype=np.float64)
+    for code, job_title in enumerate(titles):
+        positions = order[bounds[code]:bounds[code + 1]]
+        yield job_title, df.iloc[positions[top_k_positions(scores[positions], k)]]
+
+def shortlist(df, k, min_score=None):
+    groups = [group for _, group in top_k_groups(df, k, min_score)]
+    return pd.concat(groups) if groups else df.iloc[:0]
@@ -0,0 +1,160 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from compiled_requirements import compile_requirements
+from requirements import general_requirements, job_requirements
+from settings import SKILL_INDEX_PATH
+
+
+def default_tokenizer():
+    # The tokenizer scoring uses, so a search finds the candidates credited with a skill
+    return compile_requirements(job_requirements, general_requirements).tokenizer
+
+def _canonical_tokens(skillsets, tokenizer):
+    # Canonical skills per row position, worked out once per distinct Skillset
+    codes, uniques = pd.factorize(skillsets.reset_index(drop=True).astype(object).fillna('').astype(str), use_na_sentinel=False)
+    tokenized = [tokenizer.tokenize(skillset) for skillset in uniques]
+    return pd.Series([tokenized[code] for code in codes], dtype=object).explode().dropna()
+
+
+class SkillIndex:
+    # Inverted index from canonical skill (as SkillTokenizer credits it) to the sorted IDs of candidates listing it.
+    # IDs grow with every addition, so appending keeps posting lists sorted without re-sorting.
+    # On disk, posting lists are delta-encoded uint32 runs in one compressed array, stored with the
+    # tokenizer's fingerprint: an index built with other skills or aliases is discarded on load.
+
+    def __init__(self, tokenizer=None):
+        self.tokenizer = tokenizer or default_tokenizer()
+        self.postings = {}
+        self.candidates = pd.DataFrame({
+            'source': pd.Series(dtype=object), 'row': pd.Series(dtype=np.int64), 'row_hash': pd.Series(dtype=np.int64),
+        })
+        self._known_rows = set()
+
+    def __len__(self):
+        return len(self.candidates)
+
+    def add_applications(self, df, source):
+        # Indexes rows not seen before (by content hash) and returns how many were added
+        row_hashes = pd.util.hash_pandas_object(df.astype(str), index=False).to_numpy().view(np.int64)
+        new_rows = np.array([row_hash not in self._known_rows for row_hash in row_hashes.tolist()], dtype=bool)
+        new_rows &= ~pd.Series(row_hashes).duplicated().to_numpy()
+        if not new_rows.any():
+            return 0
+        first_id = len(self.candidates)
+        ids = np.arange(first_id, first_id + int(new_rows.sum()), dtype=np.uint32)
+        self.candidates = pd.concat([self.candidates, pd.DataFrame({
+            'source': source, 'row': np.flatnonzero(new_rows), 'row_hash': row_hashes[new_rows],
+        })], ignore_index=True)
+        self._known_rows.update(row_hashes[new_rows].tolist())
+
+        tokens = _canonical_tokens(df['Skillset'][new_rows], self.tokenizer)
+        token_ids = pd.DataFrame({'token': tokens.to_numpy(), 'id': ids[tokens.index.to_numpy()]}).drop_duplicates()
+        for token, group in token_ids.groupby('token', sort=False):
+            added = group['id'].to_numpy(dtype=np.uint32)
+            existing = self.postings.get(token)
+            self.postings[token] = added if existing is None else np.concatenate([existing, added])
+        return len(ids)
+
+    def canonical(self, skill):
+        # A searched skill is looked up under the canonical skill it names ('py' -> 'python')
+        skills = self.tokenizer.canonical(skill)
+        return skills[0] if skills else ''
+
+    def canonical_skills(self, skills):
+        return {self.canonical(skill) for skill in skills} - {''}
+
+    def posting(self, skill):
+        return self.postings.get(self.canonical(skill), np.zeros(0, dtype=np.uint32))
+
+    def match_all(self, skills):
+        # Candidates listing every skill; intersects the shortest posting lists first
+        lists = sorted((self.posting(skill) for skill in skills), key=len)
+        if not lists:
+            return np.zeros(0, dtype=np.uint32)
+        result = lists[0]
+        for posting in lists[1:]:
+            if not len(result):
+                break
+            result = np.intersect1d(result, posting, assume_unique=True)
+        return result
+
+    def match_any(self, skills):
+        lists = [self.posting(skill) for skill in skills]
+        return np.unique(np.concatenate(lists)) if lists else np.zeros(0, dtype=np.uint32)
+
+    def rank(self, skills, min_matches=1):
+        # Candidate IDs with how many of the skills they list, most matches first
+        lists = [self.postings.get(skill, np.zeros(0, dtype=np.uint32)) for skill in self.canonical_skills(skills)]
+        if not lists:
+            return pd.DataFrame({'candidate_id': [], 'matches': []})
+        ids, matches = np.unique(np.concatenate(lists), return_counts=True)
+        keep = matches >= min_matches
+        ranked = pd.DataFrame({'candidate_id': ids[keep], 'matches': matches[keep]})
+        return ranked.sort_values(['matches', 'candidate_id'], ascending=[False, True], kind='mergesort', ignore_index=True)
+
+    def match_job(self, job_title, job_requirements, general_requirements=None, min_matches=1):
+        profile = compile_requirements(job_requirements, general_requirements).profile(job_title)
+        return self.rank(profile.programming_languages | profile.other_skills, min_matches)
+
+    def describe(self, candidate_ids):
+        return self.candidates.iloc[np.asarray(candidate_ids, dtype=np.int64)][['source', 'row']]
+
+    def save(self, path=SKILL_INDEX_PATH):
+        tokens = sorted(self.postings)
+        lengths = np.array([len(self.postings[token]) for token in tokens], dtype=np.int64)
+        deltas = [np.diff(self.postings[token], prepend=np.uint32(0)) for token in tokens]
+        temporary_path = f'{path}.{os.getpid()}.tmp.npz'
+        np.savez_compressed(
+            temporary_path,
+            tokens=np.array(tokens, dtype=str), lengths=lengths,
+            deltas=np.concatenate(deltas).astype(np.uint32) if deltas else np.zeros(0, dtype=np.uint32),
+            sources=self.candidates['source'].to_numpy(dtype=str), rows=self.candidates['row'].to_numpy(dtype=np.int64),
+            row_hashes=self.candidates['row_hash'].to_numpy(dtype=np.int64),
+            tokenizer=np.array(self.tokenizer.fingerprint),
+        )
+        os.replace(temporary_path, path)
+
+    @classmethod
+    def load(cls, path=SKILL_INDEX_PATH, tokenizer=None):
+        index = cls(tokenizer)
+        if not os.path.exists(path):
+            return index
+        with np.load(path) as stored:
+            if 'tokenizer' not in stored or str(stored['tokenizer']) != index.tokenizer.fingerprint:
+                return index
+            starts = np.concatenate([[0], np.cumsum(stored['lengths'])])
+            deltas = stored['deltas']
+            for position, token in enumerate(stored['tokens'].tolist()):
+                index.postings[token] = np.cumsum(deltas[starts[position]:starts[position + 1]], dtype=np.uint32)
+            index.candidates = pd.DataFrame({
+                'source': stored['sources'].astype(object), 'row': stored['rows'], 'row_hash': stored['row_hashes'],
+            })
+        index._known_rows = set(index.candidates['row_hash'].tolist())
+        return index
+
+
+_lock = threading.Lock()
+_loaded = {}
+
+def update_skill_index(df, source, path=SKILL_INDEX_PATH, tokenizer=None):
+    # Adds a new application file to the persisted index
+    with _lock:
+        index = SkillIndex.load(path, tokenizer)
+        if index.add_applications(df, source):
+            index.save(path)
+        _loaded[path] = ((os.stat(path).st_mtime_ns if os.path.exists(path) else None, index.tokenizer.fingerprint), index)
+    return index
+
+def load_skill_index(path=SKILL_INDEX_PATH, tokenizer=None):
+    # Cached per process and reloaded only when the file on disk or the tokenizer changes
+    tokenizer = tokenizer or default_tokenizer()
+    with _lock:
+        version = (os.stat(path).st_mtime_ns if os.path.exists(path) else None, tokenizer.fingerprint)
+        cached = _loaded.get(path)
+        if cached is None or cached[0] != version:
+            cached = _loaded[path] = (version, SkillIndex.load(path, tokenizer))
+        return cached[1]
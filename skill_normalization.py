@@ -0,0 +1,157 @@
+import hashlib
+import json
+import os
+import re
+from functools import lru_cache
+
+# Alias -> canonical skill, applied after lowercasing and collapsing whitespace. Canonical names
+# are spelled as in job_requirements. SKILL_ALIASES_FILE (JSON or YAML, alias: skill) adds to or overrides these.
+SKILL_ALIASES = {
+    'py': 'python',
+    'python3': 'python',
+    'js': 'javascript',
+    'java script': 'javascript',
+    'ecmascript': 'javascript',
+    'golang': 'go',
+    'dotnet': '.net',
+    '.net core': '.net',
+    'asp.net': '.net',
+    'reactjs': 'react',
+    'react.js': 'react',
+    'angularjs': 'angular',
+    'shell scripting': 'bash',
+    'k8s': 'kubernetes',
+    'amazon web services': 'aws',
+    'microsoft azure': 'azure',
+    'gcp': 'google cloud',
+    'google cloud platform': 'google cloud',
+    'ci/cd': 'ci/cd pipelines',
+    'continuous integration': 'ci/cd pipelines',
+    'sdlc': 'software development life cycle',
+    'vcs': 'version control systems',
+    'version control': 'version control systems',
+    'agile': 'agile/scrum methodologies',
+    'scrum': 'agile/scrum methodologies',
+    'problem solving': 'problem-solving',
+    'team work': 'teamwork',
+    'data viz': 'data visualization',
+    'ml frameworks': 'machine learning frameworks',
+    'seo': 'seo tools',
+    'hris': 'hr software',
+}
+SKILL_ALIASES_FILE = os.environ.get('SKILL_ALIASES_FILE')
+SKILL_TOKEN_CACHE_SIZE = int(os.environ.get('SKILL_TOKEN_CACHE_SIZE', 65536))
+
+# "python 3.11", "java8", "angular2": a trailing version number on an otherwise known skill
+VERSION_SUFFIX = re.compile(r'^(.*?[^\s\d.])\s*v?\d+(?:\.\d+)*$')
+WORD = re.compile(r"[\w.#+/'’-]+")
+
+
+def normalize_token(token):
+    return ' '.join(token.lower().split())
+
+
+class SkillTrie:
+    # Aho-Corasick automaton over words: finds every known phrase inside a longer piece of text
+    # ("experience with version control systems") in one left-to-right pass over its words.
+
+    def __init__(self, phrases):
+        # phrases: {phrase: canonical skill}; node 0 is the root
+        self.transitions = [{}]
+        self.failure = [0]
+        self.outputs = [()]
+        for phrase, skill in phrases.items():
+            node = 0
+            for word in phrase.split():
+                next_node = self.transitions[node].get(word)
+                if next_node is None:
+                    next_node = len(self.transitions)
+                    self.transitions[node][word] = next_node
+                    self.transitions.append({})
+                    self.failure.append(0)
+                    self.outputs.append(())
+                node = next_node
+            self.outputs[node] += (skill,)
+        # Breadth-first, so a node's failure link is final before its children need it;
+        # the root's children fail back to the root
+        queue = list(self.transitions[0].values())
+        for node in queue:
+            for word, child in self.transitions[node].items():
+                fallback = self.failure[node]
+                while fallback and word not in self.transitions[fallback]:
+                    fallback = self.failure[fallback]
+                self.failure[child] = self.transitions[fallback].get(word, 0)
+                self.outputs[child] += self.outputs[self.failure[child]]
+                queue.append(child)
+
+    def find(self, words):
+        found = []
+        node = 0
+        for word in words:
+            while node and word not in self.transitions[node]:
+                node = self.failure[node]
+            node = self.transitions[node].get(word, 0)
+            found.extend(self.outputs[node])
+        return found
+
+
+class SkillTokenizer:
+    # Splits a raw Skillset on commas and canonicalizes each skill: exact known skill, then alias,
+    # then known skill with a version number, then known multi-word skills found inside the text.
+    # Unknown skills are kept as normalized text. Results are memoized (LRU, per instance) on the raw
+    # Skillset string and on each raw skill, so repeated skillsets and skills are only worked out once.
+
+    def __init__(self, skills, aliases=None):
+        self.aliases = dict(SKILL_ALIASES if aliases is None else aliases)
+        self.skills = frozenset(skills) | frozenset(self.aliases.values())
+        multi_word = {skill: skill for skill in self.skills if ' ' in skill}
+        multi_word.update((alias, skill) for alias, skill in self.aliases.items() if ' ' in alias)
+        self.trie = SkillTrie(multi_word)
+        # Identifies what the tokenizer maps skills to, for anything persisted in canonical skills
+        self.fingerprint = hashlib.sha1(json.dumps([sorted(self.skills), sorted(self.aliases.items())], ensure_ascii=False).encode('utf-8')).hexdigest()
+        self._memoize()
+
+    def _memoize(self):
+        # lru_cache on the bound helpers, so each tokenizer keeps its own memo
+        self.canonical = lru_cache(maxsize=SKILL_TOKEN_CACHE_SIZE)(self._canonical_token)
+        self.tokenize = lru_cache(maxsize=SKILL_TOKEN_CACHE_SIZE)(self._tokenize)
+
+    def __getstate__(self):
+        # The memos are rebuilt in each scoring worker rather than pickled with the requirements
+        return {key: value for key, value in self.__dict__.items() if key not in ('canonical', 'tokenize')}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._memoize()
+
+    def _canonical_token(self, token):
+        return self._canonical(normalize_token(token))
+
+    def _canonical(self, token):
+        if not token:
+            return ()
+        if token in self.skills:
+            return (token,)
+        if token in self.aliases:
+            return (self.aliases[token],)
+        versioned = VERSION_SUFFIX.match(token)
+        if versioned:
+            base = versioned.group(1)
+            base = self.aliases.get(base, base)
+            if base in self.skills:
+                return (base,)
+        found = self.trie.find(WORD.findall(token))
+        return tuple(dict.fromkeys([token] + found))
+
+    def _tokenize(self, skillset):
+        # Canonical skills of one raw Skillset value, without duplicates, in order of appearance
+        return tuple(dict.fromkeys(skill for token in str(skillset).split(',') for skill in self.canonical(token)))
+
+    def cache_info(self):
+        return {'skillsets': self.tokenize.cache_info().currsize, 'tokens': self.canonical.cache_info().currsize}
+
+
+if SKILL_ALIASES_FILE:
+    from requirements import load_requirements
+
+    SKILL_ALIASES = {**SKILL_ALIASES, **{normalize_token(alias): normalize_token(skill) for alias, skill in load_requirements(SKILL_ALIASES_FILE).items()}}
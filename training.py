@@ -0,0 +1,125 @@
+import glob
+import os
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+from sklearn.exceptions import NotFittedError
+from sklearn.utils.validation import check_is_fitted
+
+TRAINING_HISTORY_DIR = 'training_history'
+RESERVOIR_SIZE = 50000
+WARM_START_EXTRA_ITERATIONS = 20
+HISTORY_COLUMNS = ['Skillset', 'Age', 'Match Percentage']
+
+
+def _write_shard(df, path_without_extension):
+    # Parquet when pyarrow is available, otherwise a pickle; either way written atomically
+    try:
+        path = path_without_extension + '.parquet'
+        temporary_path = path + '.tmp'
+        df.to_parquet(temporary_path, index=False)
+    except ImportError:
+        path = path_without_extension + '.pkl'
+        temporary_path = path + '.tmp'
+        df.to_pickle(temporary_path)
+    os.replace(temporary_path, path)
+    return path
+
+def _read_shard(path):
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_pickle(path)
+
+
+class TrainingHistory:
+    # Append-only training rows: one immutable shard per batch of new hires, plus a
+    # reservoir sample of at most reservoir_size rows drawn uniformly from all of them.
+    # A batch appended with a batch_key is named after it, so has_batch() can tell it was already added.
+
+    def __init__(self, directory=TRAINING_HISTORY_DIR, reservoir_size=RESERVOIR_SIZE, seed=None):
+        self.directory = directory
+        self.reservoir_size = reservoir_size
+        self.rng = np.random.default_rng(seed)
+        os.makedirs(directory, exist_ok=True)
+
+    def shard_paths(self):
+        return sorted(glob.glob(os.path.join(self.directory, 'shard-*.parquet')) +
+                      glob.glob(os.path.join(self.directory, 'shard-*.pkl')))
+
+    def iter_shards(self):
+        for path in self.shard_paths():
+            yield _read_shard(path)
+
+    def read(self):
+        shards = list(self.iter_shards())
+        return pd.concat(shards, ignore_index=True) if shards else pd.DataFrame(columns=HISTORY_COLUMNS)
+
+    def has_batch(self, batch_key):
+        return any(os.path.basename(path).rsplit('.', 1)[0].endswith(f'-{batch_key}') for path in self.shard_paths())
+
+    def append(self, rows, batch_key=None):
+        rows = rows[HISTORY_COLUMNS].reset_index(drop=True)
+        # Time-ordered unique names, so concurrent appends never overwrite each other
+        name = f'shard-{time.time_ns():020d}-{uuid.uuid4().hex[:8]}' + (f'-{batch_key}' if batch_key else '')
+        _write_shard(rows, os.path.join(self.directory, name))
+        self._update_reservoir(rows)
+
+    def _reservoir_path(self):
+        return os.path.join(self.directory, 'reservoir.pkl')
+
+    def _reservoir_state(self):
+        if os.path.exists(self._reservoir_path()):
+            return pd.read_pickle(self._reservoir_path())
+        return {'seen': 0, 'rows': pd.DataFrame(columns=HISTORY_COLUMNS)}
+
+    def reservoir(self):
+        return self._reservoir_state()['rows']
+
+    def _update_reservoir(self, rows):
+        # Algorithm R: row t (0-based over all rows ever appended) replaces a random slot with probability size/(t+1)
+        state = self._reservoir_state()
+        sample = state['rows']
+        fill = min(max(self.reservoir_size - len(sample), 0), len(rows))
+        sample = pd.concat([sample, rows.iloc[:fill]], ignore_index=True) if len(sample) else rows.iloc[:fill].reset_index(drop=True)
+        rest = rows.iloc[fill:]
+        if len(rest):
+            positions = state['seen'] + fill + np.arange(len(rest))
+            slots = self.rng.integers(0, positions + 1)
+            replace = slots < self.reservoir_size
+            sample.iloc[slots[replace]] = rest[replace].to_numpy()
+        state = {'seen': state['seen'] + len(rows), 'rows': sample}
+        pd.to_pickle(state, self._reservoir_path() + '.tmp')
+        os.replace(self._reservoir_path() + '.tmp', self._reservoir_path())
+
+
+def final_estimator(model):
+    return model.steps[-1][1] if hasattr(model, 'steps') else model
+
+def incremental_fit(model, new_X, new_y, reservoir_training_set):
+    # partial_fit the final estimator when it supports it (e.g. SGDRegressor); otherwise
+    # warm-start refit on the bounded reservoir from reservoir_training_set() -> (X, y)
+    try:
+        check_is_fitted(model)
+    except NotFittedError:
+        model.fit(*reservoir_training_set())
+        return 'initial_fit'
+
+    estimator = final_estimator(model)
+    if hasattr(estimator, 'partial_fit'):
+        transformed_X = model[:-1].transform(new_X) if hasattr(model, 'steps') and len(model.steps) > 1 else new_X
+        estimator.partial_fit(transformed_X, new_y)
+        return 'partial_fit'
+
+    params = estimator.get_params()
+    if 'warm_start' in params:
+        changes = {'warm_start': True}
+        if 'max_iter' in params:
+            changes['max_iter'] = params['max_iter'] + WARM_START_EXTRA_ITERATIONS
+        elif 'n_estimators' in params:
+            changes['n_estimators'] = params['n_estimators'] + WARM_START_EXTRA_ITERATIONS
+        estimator.set_params(**changes)
+    reservoir_X, reservoir_y = reservoir_training_set()
+    model.fit(reservoir_X, reservoir_y)
+    return 'warm_start' if 'warm_start' in params else 'reservoir_refit'